@@ -1,5 +1,6 @@
 import operator
-from typing import Annotated, TypedDict, List, Dict, Any
+from contextlib import nullcontext
+from typing import Annotated, TypedDict, List, Dict, Any, Callable, ContextManager, Optional
 from langchain_core.messages import BaseMessage
 from langchain_core.tools import StructuredTool
 from langchain_openai import ChatOpenAI
@@ -27,7 +28,7 @@ def create_langchain_tools() -> List[StructuredTool]:
         tools.append(tool)
     return tools
 
-def create_agent_app(config: Dict[str, Any]):
+def create_agent_app(config: Dict[str, Any], status: Optional[Callable[[], ContextManager]] = None):
     """
     Create and compile the LangGraph agent.
     
@@ -36,6 +37,9 @@ def create_agent_app(config: Dict[str, Any]):
             - api_key: OpenAI API key
             - base_url: OpenAI API base URL
             - model: Model name (e.g., "gpt-4o")
+        status: Optional factory returning a context manager (e.g. a Rich
+            spinner) that is active only while waiting for the model, so
+            tool output is never mixed with the spinner.
             
     Returns:
         Compiled LangGraph application.
@@ -55,7 +59,8 @@ def create_agent_app(config: Dict[str, Any]):
     # Define the call_model node
     def call_model(state: AgentState):
         messages = state["messages"]
-        response = model.invoke(messages)
+        with (status() if status else nullcontext()):
+            response = model.invoke(messages)
         return {"messages": [response]}
         
     # Define the conditional edge logic
@@ -4,11 +4,11 @@
 本模块负责管理 AI 对话的历史记录，实现跨会话的记忆持久化。
 
 主要功能：
-1. 历史记录加载：从 JSON 文件读取对话历史
-2. 历史记录保存：将对话历史写入 JSON 文件
+1. 历史记录加载：从 JSON Lines 文件读取最近的对话历史
+2. 历史记录保存：每条新消息追加一行，定期压缩
 3. 历史记录清除：删除历史记录文件
 
-配置文件：~/.pulao/history.json
+配置文件：~/.pulao/history.jsonl（旧版 history.json 会自动迁移）
 
 数据结构：
     - 历史记录存储为消息列表
@@ -22,16 +22,32 @@
 """
 
 # ============ 标准库导入 ============
+import atexit
+import base64
+import hashlib
 import json
 import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import urlparse
 import uuid
 
 # ============ 第三方库导入 ============
 import chromadb
+import numpy as np
 import openai
 
+# orjson 为可选依赖（C 实现，序列化更快），不可用时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ============ 本地模块导入 ============
 from src.core.logger import logger  # 日志记录
 from src.core.config import CONFIG_DIR, load_config  # 配置目录
@@ -39,8 +55,60 @@ from src.core.config import CONFIG_DIR, load_config  # 配置目录
 
 # ============ 历史文件路径 ============
 
-# 对话历史文件路径
-HISTORY_FILE = CONFIG_DIR / "history.json"
+# 对话历史文件路径（JSON Lines：每行一条消息，追加写入）
+HISTORY_FILE = CONFIG_DIR / "history.jsonl"
+
+# 旧版历史文件（整体 JSON 数组），首次加载时自动迁移
+LEGACY_HISTORY_FILE = CONFIG_DIR / "history.json"
+
+# 加载/压缩时保留的最大消息条数
+HISTORY_MAX_MESSAGES = 50
+
+# 每追加多少条消息压缩一次历史文件
+HISTORY_COMPACT_INTERVAL = 100
+
+
+# ============ 辅助函数 ============
+
+def _dump_line(message: Dict) -> bytes:
+    """
+    将一条消息序列化为一行 JSON（UTF-8 字节，含换行符）
+    """
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _load_json(data: bytes):
+    """
+    解析 JSON 字节串
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _tail_from_user(history: List[Dict], limit: int) -> List[Dict]:
+    """
+    截取最近的 limit 条消息，并保证以用户消息开头
+    
+    从中间截断可能留下没有对应 tool_calls 的 tool 消息，
+    因此丢弃开头直到第一条 user 消息为止的内容。
+    
+    参数:
+        history: 消息列表（不含系统消息）
+        limit: 最大条数
+    
+    返回:
+        截取后的消息列表
+    """
+    if len(history) <= limit:
+        return history
+    tail = history[-limit:]
+    for i, msg in enumerate(tail):
+        if msg.get("role") == "user":
+            return tail[i:]
+    return []
 
 
 # ============ 记忆管理器类 ============
@@ -50,81 +118,139 @@ class MemoryManager:
     对话历史管理器
     
     提供静态方法管理对话历史的持久化存储。
-    历史记录以 JSON 格式保存在用户配置目录中。
+    历史记录以 JSON Lines 格式保存在用户配置目录中，
+    每条新消息只追加一行，定期压缩为最近的 HISTORY_MAX_MESSAGES 条。
+    写入由后台线程完成（见 _HistoryWriter），调用方不会被磁盘 I/O 阻塞。
     
     主要功能：
         - 加载历史记录
-        - 保存历史记录
+        - 追加单条消息
+        - 保存/压缩历史记录
         - 清除历史记录
+    
+    注意:
+        系统消息不持久化，AISession 每次都会重新生成系统提示词。
     """
     
     # ============ 历史记录加载方法 ============
     
     @staticmethod
-    def load_history() -> List[Dict]:
+    def load_history(limit: int = HISTORY_MAX_MESSAGES) -> List[Dict]:
         """
         加载对话历史记录
         
-        从 JSON 文件读取对话历史。
+        逐行读取 JSON Lines 文件，只返回最近的 limit 条消息。
+        如果只存在旧版 history.json，先迁移为新格式。
+        
+        参数:
+            limit: 最多返回的消息条数
         
         返回:
             消息列表，每条消息包含 role 和 content
         
         异常处理：
             - 文件不存在：返回空列表
-            - 文件损坏：记录警告并返回空列表
-            - 其他错误：记录错误并返回空列表
+            - 文件无法读取：记录错误并返回空列表
+            - 单行损坏：跳过该行
+        """
+        # 先等待排队中的写入完成，保证读到最新内容
+        _HISTORY_WRITER.flush()
+        return MemoryManager._read_history(limit)
+
+    @staticmethod
+    def _read_history(limit: int) -> List[Dict]:
+        """
+        直接从磁盘读取历史（不等待写入队列，供写入线程使用）
         """
         if not HISTORY_FILE.exists():
-            return []
+            if not LEGACY_HISTORY_FILE.exists():
+                return []
+            MemoryManager._migrate_legacy_history()
             
         try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                history = json.load(f)
-                # 验证数据类型
-                if isinstance(history, list):
-                    return history
-                else:
-                    logger.warning("History file corrupted (not a list), resetting.")
-                    return []
+            lines = HISTORY_FILE.read_bytes().splitlines()
         except Exception as e:
             logger.error(f"Failed to load history: {e}")
             return []
+        
+        history = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                history.append(_load_json(line))
+            except ValueError:
+                # 追加写入被中断时最后一行可能不完整，跳过损坏的行
+                logger.warning("Skipping corrupted history line.")
+        return _tail_from_user(history, limit)
+
+    @staticmethod
+    def _migrate_legacy_history():
+        """
+        将旧版 history.json（整体 JSON 数组）迁移为 history.jsonl
+        """
+        try:
+            history = _load_json(LEGACY_HISTORY_FILE.read_bytes())
+            if isinstance(history, list):
+                messages = [m for m in history if m.get("role") != "system"]
+                _write_snapshot(_tail_from_user(messages, HISTORY_MAX_MESSAGES))
+            else:
+                logger.warning("History file corrupted (not a list), resetting.")
+            os.remove(LEGACY_HISTORY_FILE)
+        except Exception as e:
+            logger.error(f"Failed to migrate legacy history: {e}")
 
     # ============ 历史记录保存方法 ============
     
     @staticmethod
-    def save_history(history: List[Dict]):
+    def append_message(message: Dict):
         """
-        保存对话历史记录
+        追加一条消息到历史文件（异步）
         
-        将对话历史写入 JSON 文件。
+        只把消息放入写入队列，由后台线程写盘，REPL 线程无需等待磁盘 I/O。
+        每追加 HISTORY_COMPACT_INTERVAL 条压缩一次文件，防止无限增长。
+        
+        参数:
+            message: 消息字典（系统消息会被忽略）
+        """
+        if message.get("role") == "system":
+            return
+        _HISTORY_WRITER.put(("append", message))
+
+    @staticmethod
+    def save_history(history: List[Dict]):
+        """
+        保存完整的对话历史记录（异步，覆盖现有文件）
         
         参数:
             history: 消息列表
         
         存储格式：
-            - JSON 格式
+            - JSON Lines 格式（每行一条消息，无缩进）
             - UTF-8 编码
-            - 格式化缩进
         
         注意:
             - 会自动创建父目录
             - 会覆盖现有文件
-        
-        优化考虑：
-            - 可以限制保存的消息数量防止文件无限增长
-            - AISession 单独管理系统提示词
+            - 系统消息不保存，且只保留最近 HISTORY_MAX_MESSAGES 条
+            - 队列中连续的多次保存只写入最后一次（后者覆盖前者）
         """
-        try:
-            # 确保目录存在
-            HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 写入历史记录
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save history: {e}")
+        messages = [m for m in history if m.get("role") != "system"]
+        _HISTORY_WRITER.put(("save", _tail_from_user(messages, HISTORY_MAX_MESSAGES)))
+
+    @staticmethod
+    def compact_history():
+        """
+        压缩历史文件，只保留最近的 HISTORY_MAX_MESSAGES 条消息
+        """
+        _HISTORY_WRITER.put(("compact", None))
+
+    @staticmethod
+    def flush():
+        """
+        等待所有排队的历史写入完成
+        """
+        _HISTORY_WRITER.flush()
 
     # ============ 历史记录清除方法 ============
     
@@ -133,62 +259,469 @@ class MemoryManager:
         """
         清除对话历史记录
         
-        删除历史记录文件。
+        删除历史记录文件（包括旧版 history.json）。
         
         注意:
             - 如果文件不存在不会报错
             - 无法恢复，请谨慎使用
         """
-        if HISTORY_FILE.exists():
+        _HISTORY_WRITER.flush()
+        for path in (HISTORY_FILE, LEGACY_HISTORY_FILE):
+            if path.exists():
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    logger.error(f"Failed to clear history: {e}")
+
+
+# ============ 后台历史写入 ============
+
+# 历史目录是否已确认存在（进程内只需创建一次）
+_history_dir_ready = False
+
+
+def _ensure_history_dir():
+    """
+    确保历史文件所在目录存在（只在第一次写入时执行 mkdir）
+    """
+    global _history_dir_ready
+    if not _history_dir_ready:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _history_dir_ready = True
+
+
+def _write_lines(messages: List[Dict]):
+    """
+    将多条消息追加到历史文件（一次 open/write）
+    """
+    _ensure_history_dir()
+    with open(HISTORY_FILE, "ab") as f:
+        f.write(b"".join(_dump_line(m) for m in messages))
+
+
+def _write_snapshot(messages: List[Dict]):
+    """
+    用给定消息整体重写历史文件
+    
+    先写入同目录下的临时文件，再用 os.replace 原子替换，
+    写入过程中崩溃也不会留下半截的历史文件。
+    """
+    _ensure_history_dir()
+    tmp = HISTORY_FILE.with_suffix(".jsonl.tmp")
+    tmp.write_bytes(b"".join(_dump_line(m) for m in messages))
+    os.replace(tmp, HISTORY_FILE)
+
+
+class _HistoryWriter:
+    """
+    历史文件后台写入器
+    
+    REPL 线程只负责入队，守护线程取出后合并写盘：
+        - 连续的 append 合并为一次文件写入
+        - 多个 save 快照只写最后一个（之前的 append 被快照覆盖）
+        - 追加条数达到 HISTORY_COMPACT_INTERVAL 时压缩文件
+    
+    进程退出时通过 atexit 等待队列写完，避免丢失最后几条消息。
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._appends_since_compact = 0
+
+    def put(self, item):
+        """入队一个写入操作，首次调用时启动写入线程"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="pulao-history-writer", daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.flush)
+        self._queue.put(item)
+
+    def flush(self):
+        """阻塞直到队列中的所有写入完成"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # 取出队列中已有的所有操作，合并处理
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
             try:
-                os.remove(HISTORY_FILE)
+                self._process(batch)
             except Exception as e:
-                logger.error(f"Failed to clear history: {e}")
+                logger.error(f"Failed to save history: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _process(self, batch):
+        # 最后一个快照之前的操作都会被覆盖，直接跳过
+        start = 0
+        for i, (kind, _) in enumerate(batch):
+            if kind == "save":
+                start = i
+        
+        pending: List[Dict] = []
+        compact = False
+        for kind, payload in batch[start:]:
+            if kind == "save":
+                _write_snapshot(payload)
+                self._appends_since_compact = 0
+            elif kind == "append":
+                pending.append(payload)
+            elif kind == "compact":
+                compact = True
+        
+        if pending:
+            _write_lines(pending)
+            self._appends_since_compact += len(pending)
+        
+        if compact or self._appends_since_compact >= HISTORY_COMPACT_INTERVAL:
+            _write_snapshot(MemoryManager._read_history(HISTORY_MAX_MESSAGES))
+            self._appends_since_compact = 0
+
+
+# 全局写入器（写入线程在第一次写入时启动）
+_HISTORY_WRITER = _HistoryWriter()
+
+
+# ============ 嵌入向量缓存 ============
+
+# 嵌入缓存数据库路径（SQLite，跨会话保留）
+EMBEDDING_CACHE_FILE = CONFIG_DIR / "embed_cache" / "embeddings.sqlite3"
+
+# 内存中最多缓存的向量个数
+EMBEDDING_CACHE_SIZE = 1000
+
+
+class _EmbeddingCache:
+    """
+    两级嵌入向量缓存
+    
+    - 第一级：进程内 LRU（OrderedDict，命中时移到末尾）
+    - 第二级：SQLite 磁盘缓存，向量以 float32 字节存储
+    
+    键为 sha256(模型名 + NUL + 文本) 的摘要，相同文本不会重复请求 Embedding 接口。
+    磁盘缓存出错时只记录警告并退化为纯内存缓存。
+    """
+
+    def __init__(self, path: Path = EMBEDDING_CACHE_FILE, capacity: int = EMBEDDING_CACHE_SIZE):
+        self.path = path
+        self.capacity = capacity
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_failed = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        """计算缓存键"""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """首次使用时打开磁盘缓存"""
+        if self._conn is None and not self._disk_failed:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                # WAL + NORMAL 同步：每次写入不再强制 fsync 主库文件，
+                # 崩溃时最多丢失最近的缓存条目（可重新生成）
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute("PRAGMA temp_store=MEMORY")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding disk cache disabled: {e}")
+                self._disk_failed = True
+                self._conn = None
+        return self._conn
+
+    def _remember(self, key: bytes, vec: np.ndarray):
+        """写入内存 LRU，超出容量时淘汰最久未使用的向量"""
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """
+        查询缓存
+        
+        返回:
+            向量列表，未命中时返回 None
+        """
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                return vec
+            
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache read failed: {e}")
+                return None
+            if row is None:
+                return None
+            
+            # 只读视图，直接引用数据库返回的字节，无需逐个转换
+            vec = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vec)
+            return vec
+
+    def put(self, key: bytes, vec: np.ndarray):
+        """
+        写入缓存（内存 + 磁盘）
+        """
+        with self._lock:
+            self._remember(key, vec)
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                    (key, vec.tobytes()),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+
+# ============ 向量辅助函数 ============
+
+def _to_vector(values) -> np.ndarray:
+    """
+    将接口返回的嵌入转换为 float32 向量
+    
+    请求时使用 encoding_format="base64"，接口直接返回 float32 字节的 base64 编码，
+    用 np.frombuffer 解码即可，无需解析上千个 JSON 浮点数；
+    部分兼容接口忽略该参数仍返回浮点数列表，此时按列表转换。
+    float32 数组比 Python float 列表小约 8 倍，且 ChromaDB 可以直接接收。
+    """
+    if isinstance(values, str):
+        return np.frombuffer(base64.b64decode(values), dtype=np.float32)
+    return np.asarray(values, dtype=np.float32)
+
+
+def _stack(vectors: List[np.ndarray]) -> np.ndarray:
+    """
+    将多个向量合并为一个 (N, dim) 的 float32 矩阵
+    """
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack(vectors)
+
+
+# ============ OpenAI 客户端 ============
+
+# 共享的 OpenAI 客户端：{(api_key, base_url): 客户端}
+_OPENAI_CLIENTS: Dict[tuple, openai.OpenAI] = {}
+
+# 共享的嵌入服务：{(api_key, base_url, model): 实例}
+_EMBEDDING_SERVICES: Dict[tuple, "EmbeddingService"] = {}
+
+# 嵌入模型
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> openai.OpenAI:
+    """
+    获取共享的 OpenAI 客户端
+    
+    每个客户端内部维护一个 HTTP 连接池，复用同一个客户端可以保持
+    keep-alive 连接，避免每次请求都重新建立 TCP/TLS 连接。
+    切换提供商（api_key/base_url 变化）时会创建新的客户端。
+    
+    参数:
+        api_key: API 密钥
+        base_url: API 端点地址
+    
+    返回:
+        openai.OpenAI 实例
+    """
+    key = (api_key, base_url)
+    client = _OPENAI_CLIENTS.get(key)
+    if client is None:
+        client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        _OPENAI_CLIENTS[key] = client
+    return client
+
+
+def get_embedding_service() -> "EmbeddingService":
+    """
+    获取当前提供商对应的共享嵌入服务实例
+    
+    按 (api_key, base_url, model) 缓存，与 get_openai_client 一致：
+    通过 llm use / llm config 切换提供商后，使用新的凭据和端点。
+    
+    返回:
+        EmbeddingService 实例
+    """
+    config = load_config()
+    key = (config.get("api_key", ""), config.get("base_url"), EMBEDDING_MODEL)
+    service = _EMBEDDING_SERVICES.get(key)
+    if service is None:
+        service = EmbeddingService(config)
+        _EMBEDDING_SERVICES[key] = service
+    return service
 
 
 # ============ 向量记忆类 ============
 
+# 单次 Embedding 请求的最大文本数
+EMBEDDING_BATCH_SIZE = 128
+
+# 单次写入 ChromaDB 的最大记录数
+CHROMA_BATCH_SIZE = 250
+
+# 检索结果缓存：最多条数和有效期（秒），有效期防止其他进程写入后长期返回旧结果
+SEARCH_CACHE_SIZE = 128
+SEARCH_CACHE_TTL = 60.0
+
+
 class EmbeddingService:
     """
     嵌入向量服务
     
     负责将文本转换为向量。
+    相同文本的向量会被缓存（见 _EmbeddingCache），
+    可在配置中设置 embedding_cache: false 关闭。
     """
     
-    def __init__(self):
+    # 所有实例共享的嵌入缓存
+    _cache: Optional[_EmbeddingCache] = None
+    
+    def __init__(self, config: Optional[Dict] = None):
         """
         初始化嵌入服务
+        
+        参数:
+            config: 配置字典，为空时读取当前配置
         """
-        config = load_config()
-        # 优先使用配置中的 API Key
-        self.client = openai.OpenAI(
-            api_key=config.get("api_key", ""),
-            base_url=config.get("base_url")
-        )
+        if config is None:
+            config = load_config()
+        # 优先使用配置中的 API Key（复用进程内共享的客户端和连接池）
+        self.client = get_openai_client(config.get("api_key", ""), config.get("base_url"))
         # 默认使用 text-embedding-3-small 模型
-        self.model = "text-embedding-3-small"
+        self.model = EMBEDDING_MODEL
+        
+        # 嵌入缓存（默认开启）
+        self.use_cache = config.get("embedding_cache", True)
+        if self.use_cache and EmbeddingService._cache is None:
+            EmbeddingService._cache = _EmbeddingCache()
 
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str) -> np.ndarray:
         """
         获取文本的嵌入向量
         
+        先查缓存，未命中时调用 Embedding 接口并写入缓存。
+        
         参数:
             text: 输入文本
             
         返回:
-            嵌入向量列表
+            float32 嵌入向量
         """
+        # 移除换行符以优化嵌入效果
+        text = text.replace("\n", " ").strip()
+        
+        key = None
+        if self.use_cache:
+            key = _EmbeddingCache.make_key(self.model, text)
+            cached = EmbeddingService._cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
-            # 移除换行符以优化嵌入效果
-            text = text.replace("\n", " ")
             response = self.client.embeddings.create(
                 input=[text],
-                model=self.model
+                model=self.model,
+                encoding_format="base64"
             )
-            return response.data[0].embedding
+            embedding = _to_vector(response.data[0].embedding)
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
+        
+        if key is not None:
+            EmbeddingService._cache.put(key, embedding)
+        return embedding
+
+    def get_embeddings(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """
+        批量获取文本的嵌入向量
+        
+        缓存命中的文本直接返回，其余文本按 batch_size 分批，
+        每批只发一次 Embedding 请求。
+        
+        参数:
+            texts: 输入文本列表
+            batch_size: 每次请求的最大文本数
+            
+        返回:
+            (len(texts), dim) 的 float32 矩阵，行顺序与 texts 一致
+        """
+        texts, keys, results, missing = self._lookup_cached(texts)
+        
+        # 未命中的文本分批请求
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            try:
+                response = self.client.embeddings.create(
+                    input=[texts[i] for i in chunk],
+                    model=self.model,
+                    encoding_format="base64"
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate embeddings: {e}")
+                raise
+            self._store(chunk, response, keys, results)
+        
+        return _stack(results)
+
+    def _lookup_cached(self, texts: List[str]):
+        """
+        规范化文本并查询缓存
+        
+        返回:
+            (规范化后的文本, 缓存键, 结果列表（命中处已填充）, 未命中的下标列表)
+        """
+        texts = [text.replace("\n", " ").strip() for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        keys: List[Optional[bytes]] = [None] * len(texts)
+        missing = []
+        for i, text in enumerate(texts):
+            if self.use_cache:
+                keys[i] = _EmbeddingCache.make_key(self.model, text)
+                results[i] = EmbeddingService._cache.get(keys[i])
+            if results[i] is None:
+                missing.append(i)
+        return texts, keys, results, missing
+
+    def _store(self, chunk: List[int], response, keys: List[Optional[bytes]], results: List):
+        """
+        将一批 Embedding 响应填入结果列表并写入缓存
+        """
+        for i, item in zip(chunk, response.data):
+            results[i] = _to_vector(item.embedding)
+            if keys[i] is not None:
+                EmbeddingService._cache.put(keys[i], results[i])
 
 
 class VectorMemory:
@@ -196,6 +729,10 @@ class VectorMemory:
     向量记忆存储
     
     使用 ChromaDB 存储和检索文本向量。
+    
+    默认使用进程内的 PersistentClient（~/.pulao/chroma_db）；
+    配置了 chroma_url（如 http://localhost:8000）时连接独立的 Chroma 服务，
+    避免进程内 SQLite 锁阻塞 REPL。
     """
     
     def __init__(self):
@@ -204,18 +741,47 @@ class VectorMemory:
         
         - 初始化 ChromaDB 客户端
         - 获取或创建集合
-        - 初始化嵌入服务
         """
-        db_path = CONFIG_DIR / "chroma_db"
         try:
-            self.client = chromadb.PersistentClient(path=str(db_path))
+            self.client = self._create_client(load_config().get("chroma_url"))
             # 获取或创建集合
             self.collection = self.client.get_or_create_collection(name="memory")
-            self.embedding_service = EmbeddingService()
+            # 查询结果缓存：{(查询摘要, n_results): (缓存时间, 结果)}
+            self._query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+            self._query_lock = threading.Lock()
         except Exception as e:
             logger.error(f"Failed to initialize VectorMemory: {e}")
             raise
 
+    @property
+    def embedding_service(self) -> EmbeddingService:
+        """
+        当前提供商的嵌入服务（每次访问时按当前配置获取，切换提供商后立即生效）
+        """
+        return get_embedding_service()
+
+    @staticmethod
+    def _create_client(chroma_url: Optional[str]):
+        """
+        创建 ChromaDB 客户端
+        
+        参数:
+            chroma_url: Chroma 服务地址，为空时使用本地持久化存储
+        
+        返回:
+            ChromaDB 客户端
+        """
+        if not chroma_url:
+            return chromadb.PersistentClient(path=str(CONFIG_DIR / "chroma_db"))
+        
+        url = urlparse(chroma_url)
+        ssl = url.scheme == "https"
+        return chromadb.HttpClient(
+            host=url.hostname or "localhost",
+            port=url.port or (443 if ssl else 8000),
+            ssl=ssl
+        )
+
     def add_memory(self, text: str, metadata: Dict = None):
         """
         添加记忆
@@ -226,22 +792,49 @@ class VectorMemory:
             text: 记忆文本
             metadata: 元数据字典
         """
+        self.add_memories([text], [metadata] if metadata else None)
+
+    def add_memories(self, texts: List[str], metadatas: Optional[List[Dict]] = None):
+        """
+        批量添加记忆
+        
+        一次请求生成所有嵌入，并按 CHROMA_BATCH_SIZE 分批写入 ChromaDB，
+        避免逐条添加时的多次网络往返和数据库事务。
+        
+        参数:
+            texts: 记忆文本列表
+            metadatas: 元数据字典列表（与 texts 一一对应，可选）
+        """
+        if not texts:
+            return
         try:
-            embedding = self.embedding_service.get_embedding(text)
-            # 生成唯一 ID
-            doc_id = str(uuid.uuid4())
-            
-            self.collection.add(
-                documents=[text],
-                embeddings=[embedding],
-                metadatas=[metadata] if metadata else None,
-                ids=[doc_id]
-            )
-            logger.info(f"Added memory: {text[:50]}...")
+            embeddings = self.embedding_service.get_embeddings(texts)
+            self._add_embedded(texts, embeddings, metadatas)
         except Exception as e:
             logger.error(f"Failed to add memory: {e}")
             raise
 
+    def _add_embedded(self, texts: List[str], embeddings: np.ndarray, metadatas: Optional[List[Dict]]):
+        """
+        将已生成嵌入的记忆按 CHROMA_BATCH_SIZE 分批写入 ChromaDB
+        """
+        # 生成唯一 ID
+        ids = [str(uuid.uuid4()) for _ in texts]
+        
+        for start in range(0, len(texts), CHROMA_BATCH_SIZE):
+            end = start + CHROMA_BATCH_SIZE
+            self.collection.add(
+                documents=texts[start:end],
+                embeddings=embeddings[start:end],
+                metadatas=metadatas[start:end] if metadatas else None,
+                ids=ids[start:end]
+            )
+        logger.info(f"Added {len(texts)} memories: {texts[0][:50]}...")
+        
+        # 新增记忆会改变检索结果，清空查询缓存
+        with self._query_lock:
+            self._query_cache.clear()
+
     def search_memory(self, query: str, n_results: int = 3) -> Dict:
         """
         搜索记忆
@@ -253,18 +846,32 @@ class VectorMemory:
             n_results: 返回结果数量
             
         返回:
-            查询结果字典
+            查询结果字典（相同查询在 SEARCH_CACHE_TTL 秒内直接返回缓存结果，调用方不得修改）
         """
+        key = (hashlib.sha256(query.encode("utf-8")).digest(), n_results)
+        now = time.monotonic()
+        with self._query_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None and now - cached[0] < SEARCH_CACHE_TTL:
+                self._query_cache.move_to_end(key)
+                return cached[1]
+        
         try:
             embedding = self.embedding_service.get_embedding(query)
             results = self.collection.query(
                 query_embeddings=[embedding],
                 n_results=n_results
             )
-            return results
         except Exception as e:
             logger.error(f"Failed to search memory: {e}")
             raise
+        
+        with self._query_lock:
+            self._query_cache[key] = (now, results)
+            self._query_cache.move_to_end(key)
+            if len(self._query_cache) > SEARCH_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return results
 
 
 # 全局向量记忆实例
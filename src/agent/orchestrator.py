@@ -28,18 +28,17 @@ import json
 from typing import Optional, List, Dict
 
 # ============ 第三方库导入 ============
-import openai
 from rich.console import Console
 from rich.syntax import Syntax
 from rich.prompt import Confirm, Prompt
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
 
 # ============ 本地模块导入 ============
-from src.agent.prompts import get_system_prompt  # 获取 AI 系统提示词
+from src.agent.prompts import get_system_prompt, invalidate_system_info_cache  # 获取 AI 系统提示词
 from src.core.i18n import t  # 国际化翻译函数
 from src.tools.utils.library_manager import LibraryManager  # 模板库管理
 from src.core.logger import logger  # 日志记录
-from src.agent.memory import MemoryManager, init_vector_memory  # 内存/历史记录管理
+from src.agent.memory import MemoryManager, init_vector_memory, get_openai_client, HISTORY_MAX_MESSAGES  # 内存/历史记录管理
 from src.agent.graph import create_agent_app  # LangGraph Agent App
 
 # 创建 Rich 控制台对象，用于彩色输出
@@ -59,6 +58,7 @@ class AISession:
         client: OpenAI 客户端实例
         model: 使用的模型名称
         history: 对话历史列表，每条消息是一个字典包含 role 和 content
+                 （除系统消息外最多保留 HISTORY_MAX_MESSAGES 条）
     
     初始化流程:
         1. 从配置文件或磁盘加载历史记录
@@ -82,11 +82,11 @@ class AISession:
         # 从磁盘加载历史记录（支持跨会话保存对话上下文）
         loaded_history = MemoryManager.load_history()
         
-        # 创建 OpenAI 客户端
+        # 获取共享的 OpenAI 客户端
         # 支持任意兼容 OpenAI API 的服务（如 DeepSeek、Azure OpenAI 等）
-        self.client = openai.OpenAI(
-            api_key=config.get("api_key", ""),
-            base_url=config.get("base_url", "https://api.deepseek.com")
+        self.client = get_openai_client(
+            config.get("api_key", ""),
+            config.get("base_url", "https://api.deepseek.com")
         )
         
         # 设置使用的模型（默认为 deepseek-reasoner）
@@ -113,10 +113,36 @@ class AISession:
         """
         保存当前对话历史到磁盘
         
-        每次添加新消息后自动调用，确保对话上下文持久化。
+        整体重写历史文件；日常添加消息使用追加写入（见 _append）。
         这样用户退出后再进入，AI 仍然记得之前的对话内容。
         """
         MemoryManager.save_history(self.history)
+
+    def _append(self, msg: Dict):
+        """
+        添加一条消息并以追加方式持久化（不重写整个历史文件）
+        
+        参数:
+            msg: 消息字典
+        """
+        self.history.append(msg)
+        MemoryManager.append_message(msg)
+        
+    def _trim_history(self):
+        """
+        在新一轮对话开始前限制内存中的历史长度
+        
+        保留系统消息和最近的消息，使新的用户消息加入后
+        非系统消息不超过 HISTORY_MAX_MESSAGES 条；
+        截断点向后移动到 user 消息，避免留下孤立的 tool 消息。
+        """
+        keep = HISTORY_MAX_MESSAGES - 1
+        if len(self.history) - 1 <= keep:
+            return
+        
+        tail = self.history[-keep:]
+        start = next((i for i, msg in enumerate(tail) if msg["role"] == "user"), len(tail))
+        self.history = self.history[:1] + tail[start:]
         
     def add_user_message(self, content: str):
         """
@@ -125,8 +151,8 @@ class AISession:
         参数:
             content: 用户输入的内容
         """
-        self.history.append({"role": "user", "content": content})
-        self.save()
+        self._trim_history()
+        self._append({"role": "user", "content": content})
         
     def add_assistant_message(self, content: str, tool_calls=None):
         """
@@ -139,8 +165,7 @@ class AISession:
         msg = {"role": "assistant", "content": content}
         if tool_calls:
             msg["tool_calls"] = tool_calls
-        self.history.append(msg)
-        self.save()
+        self._append(msg)
 
     def add_tool_message(self, tool_call_id: str, content: str):
         """
@@ -153,12 +178,11 @@ class AISession:
             tool_call_id: 工具调用 ID，用于匹配是哪个工具调用返回的结果
             content: 工具执行结果的文本内容
         """
-        self.history.append({
+        self._append({
             "role": "tool", 
             "tool_call_id": tool_call_id,
             "content": content
         })
-        self.save()
 
     def get_messages(self) -> List[Dict]:
         """
@@ -417,27 +441,31 @@ def process_deployment(instruction: str, config: dict):
         instruction: 用户输入的自然语言指令（如 "部署一个 Redis"）
         config: 应用程序配置字典
     """
+    # 立即回显指令，在检索和网络请求之前给出反馈
+    console.print(f"[bold cyan]{t('analyzing_request')}[/bold cyan] {instruction}")
+    
     # 获取 AI 会话实例
     session = get_session(config)
 
-    # 1. RAG 检索
-    rag_context = _perform_rag_search(instruction)
-    
-    # 2. 模板检查
-    template_context = _match_template(instruction)
+    # 1. RAG 检索 / 2. 模板检查（检索需要请求 Embedding 接口，显示等待动画）
+    with console.status(f"[dim]{t('analyzing_request')}[/dim]", spinner="dots"):
+        rag_context = _perform_rag_search(instruction)
+        template_context = _match_template(instruction)
     
     # 3. 组装最终指令
     final_instruction = instruction + template_context + rag_context
     session.add_user_message(final_instruction)
     
-    # 提示用户正在发送请求
-    console.print(f"[dim]{t('sending_request')}[/dim]")
     logger.info(f"Sending request to AI: {instruction[:50]}...")
     
+    # 等待模型响应时显示动画（工具执行期间不显示，避免与工具输出交错）
+    def model_status():
+        return console.status(f"[cyan]{t('sending_request')}[/cyan]", spinner="dots")
+    
     # ============ LangGraph Execution ============
     try:
         # Initialize app
-        app = create_agent_app(config)
+        app = create_agent_app(config, status=model_status)
     except Exception as e:
         logger.critical(f"Failed to initialize AI Agent: {e}", exc_info=True)
         console.print(f"[bold red]Critical Error:[/bold red] Failed to initialize AI Agent.\n{e}")
@@ -459,6 +487,9 @@ def process_deployment(instruction: str, config: dict):
         # Process new messages to update history and print to console
         _process_new_messages(session, new_messages)
         
+        # 工具调用可能改变了本机状态（容器、端口），下一轮重新采集系统信息
+        invalidate_system_info_cache()
+        
         # Memory Storage
         _save_memory_interaction(instruction, new_messages)
                 
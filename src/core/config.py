@@ -19,12 +19,17 @@
 
 # ============ 标准库导入 ============
 import os
+import copy
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 
 # ============ 第三方库导入 ============
 import yaml
 
+# 优先使用 libyaml 提供的 C 解析器/生成器，不可用时回退到纯 Python 实现
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 # ============ 本地模块导入 ============
 from src.core.i18n import set_language  # 设置界面语言
 
@@ -66,11 +71,134 @@ DEFAULT_CONFIG = {
 }
 
 
+# ============ 配置缓存 ============
+
+# 配置缓存：记录全局/用户配置文件的状态戳、解析结果及排序后的提供商名称
+# 只有文件的 mtime 或大小发生变化时才重新解析 YAML
+_CONFIG_CACHE: Dict = {"stamp": None, "config": None, "provider_names": ()}
+
+
+def file_stamp(path: Path) -> Optional[tuple]:
+    """
+    获取文件的状态戳（用于判断文件是否变化）
+    
+    参数:
+        path: 文件路径
+    
+    返回:
+        (st_mtime_ns, st_size) 元组，文件不存在时返回 None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def yaml_load(stream):
+    """
+    安全解析 YAML（优先使用 libyaml 的 C 解析器）
+    
+    参数:
+        stream: 文件对象或字符串
+    
+    返回:
+        解析结果
+    """
+    return yaml.load(stream, Loader=_YAML_LOADER)
+
+
+def yaml_dump(data, stream=None, **kwargs):
+    """
+    安全输出 YAML（优先使用 libyaml 的 C 生成器）
+    
+    参数:
+        data: 要输出的数据
+        stream: 文件对象，为空时返回字符串
+        **kwargs: 传给 yaml.dump 的其他选项
+    
+    返回:
+        stream 为空时返回 YAML 字符串
+    """
+    return yaml.dump(data, stream, Dumper=_YAML_DUMPER, **kwargs)
+
+
+def clear_config_cache():
+    """
+    清除配置缓存，下次 load_config 会重新读取配置文件
+    """
+    _CONFIG_CACHE["stamp"] = None
+    _CONFIG_CACHE["config"] = None
+    _CONFIG_CACHE["provider_names"] = ()
+
+
+def _order_provider_names(providers: Dict) -> Tuple[str, ...]:
+    """
+    计算提供商名称的显示顺序：default 排在最前面，其余按字母顺序
+    
+    参数:
+        providers: 提供商字典
+    
+    返回:
+        排序后的提供商名称元组
+    """
+    others = tuple(sorted(k for k in providers if k != "default"))
+    return ("default",) + others if "default" in providers else others
+
+
+def _get_cached_config() -> Dict:
+    """
+    获取缓存的配置（文件变化时重新加载）
+    
+    返回:
+        缓存中的配置字典（调用方不得修改）
+    """
+    stamp = (str(CONFIG_FILE), file_stamp(GLOBAL_CONFIG_FILE), file_stamp(CONFIG_FILE))
+    
+    if _CONFIG_CACHE["config"] is None or _CONFIG_CACHE["stamp"] != stamp:
+        config = _load_config_from_files()
+        _CONFIG_CACHE["config"] = config
+        _CONFIG_CACHE["provider_names"] = _order_provider_names(config.get("providers", {}))
+        _CONFIG_CACHE["stamp"] = stamp
+    
+    return _CONFIG_CACHE["config"]
+
+
+def get_provider_names() -> Tuple[str, ...]:
+    """
+    获取排序后的提供商名称（与 llm list 显示的序号一致）
+    
+    排序结果随配置一起缓存，只有配置文件变化时才重新计算。
+    
+    返回:
+        提供商名称元组，default 在最前，其余按字母顺序
+    """
+    _get_cached_config()
+    return _CONFIG_CACHE["provider_names"]
+
+
 # ============ 配置加载函数 ============
 
 def load_config() -> Dict:
     """
-    加载配置文件
+    加载配置文件（带缓存）
+    
+    以全局配置和用户配置文件的 (mtime_ns, size) 作为缓存键，
+    文件未变化时直接返回缓存结果的副本，避免重复解析 YAML。
+    
+    返回:
+        包含所有配置项的字典（调用方可以自由修改，不影响缓存）
+    """
+    cfg = copy.deepcopy(_get_cached_config())
+    
+    # 每次加载都同步界面语言
+    set_language(cfg.get("language", "en"))
+    return cfg
+
+
+def _load_config_from_files() -> Dict:
+    """
+    从文件加载配置（不使用缓存）
     
     加载顺序（优先级从低到高）：
     1. 默认配置（最低优先级）
@@ -88,8 +216,8 @@ def load_config() -> Dict:
     - 自动迁移旧版本的扁平配置结构到新的嵌套结构
     - 将当前提供商的配置展平到根层级（向后兼容）
     """
-    # 从默认配置开始
-    final_config = DEFAULT_CONFIG.copy()
+    # 从默认配置开始（深拷贝，避免合并 providers 时修改 DEFAULT_CONFIG）
+    final_config = copy.deepcopy(DEFAULT_CONFIG)
     
     # 内部函数：迁移旧版扁平配置到新版嵌套结构
     # 旧版格式：{api_key: "...", base_url: "...", model: "..."}
@@ -111,10 +239,10 @@ def load_config() -> Dict:
         return cfg
 
     # ====== 步骤 1: 加载全局配置 ======
-    if GLOBAL_CONFIG_FILE.exists():
+    if os.path.exists(GLOBAL_CONFIG_FILE):
         try:
             with open(GLOBAL_CONFIG_FILE, "r", encoding="utf-8") as f:
-                global_config = yaml.safe_load(f) or {}
+                global_config = yaml_load(f) or {}
                 # 处理旧格式迁移
                 global_config = migrate_flat_config(global_config)
                 
@@ -128,10 +256,10 @@ def load_config() -> Dict:
             pass  # 忽略全局配置加载错误
 
     # ====== 步骤 2: 加载用户配置 ======
-    if CONFIG_FILE.exists():
+    if os.path.exists(CONFIG_FILE):
         try:
             with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                user_config = yaml.safe_load(f) or {}
+                user_config = yaml_load(f) or {}
                 # 处理旧格式迁移
                 user_config = migrate_flat_config(user_config)
                 
@@ -149,20 +277,30 @@ def load_config() -> Dict:
     # ====== 步骤 3: 向后兼容处理 ======
     # 将当前提供商的配置展平到根层级，方便旧代码访问
     # 新代码应该从 final_config["providers"][provider_name] 获取配置
-    current_provider_name = final_config.get("current_provider", "default")
-    provider_config = final_config.get("providers", {}).get(current_provider_name, {})
-    
-    final_config["api_key"] = provider_config.get("api_key", "")
-    final_config["base_url"] = provider_config.get("base_url", "")
-    final_config["model"] = provider_config.get("model", "")
-
-    # ====== 步骤 4: 设置语言 ======
-    # 加载完成后立即设置界面语言
-    set_language(final_config.get("language", "en"))
+    _flatten_current_provider(final_config)
             
     return final_config
 
 
+def _flatten_current_provider(cfg: Dict) -> Dict:
+    """
+    将当前提供商的 api_key / base_url / model 展平到配置根层级
+    
+    参数:
+        cfg: 配置字典（原地修改）
+    
+    返回:
+        同一个配置字典
+    """
+    current_provider_name = cfg.get("current_provider", "default")
+    provider_config = cfg.get("providers", {}).get(current_provider_name, {})
+    
+    cfg["api_key"] = provider_config.get("api_key", "")
+    cfg["base_url"] = provider_config.get("base_url", "")
+    cfg["model"] = provider_config.get("model", "")
+    return cfg
+
+
 def save_config(config_data: Dict):
     """
     保存配置到文件
@@ -190,14 +328,17 @@ def save_config(config_data: Dict):
     
     try:
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            yaml.dump(to_save, f)
+            yaml_dump(to_save, f)
     except PermissionError:
         # 权限错误，回退到临时文件
         import tempfile
         CONFIG_FILE = Path(tempfile.gettempdir()) / "pulao" / "config.yaml"
         CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            yaml.dump(to_save, f)
+            yaml_dump(to_save, f)
+    
+    # 配置已变更，使缓存失效
+    clear_config_cache()
     
     # 更新运行时语言设置
     set_language(to_save.get("language", "en"))
@@ -222,7 +363,7 @@ def add_provider(name: str, api_key: str, base_url: str, model: str):
         - 保存配置到文件
     
     返回:
-        配置文件路径
+        更新后的配置字典（已展平当前提供商），调用方无需重新加载
     """
     # 加载当前配置
     cfg = load_config()
@@ -244,7 +385,7 @@ def add_provider(name: str, api_key: str, base_url: str, model: str):
         
     # 保存配置
     save_config(cfg)
-    return CONFIG_FILE
+    return _flatten_current_provider(cfg)
 
 
 def switch_provider(name: str):
@@ -254,6 +395,9 @@ def switch_provider(name: str):
     参数:
         name: 提供商名称
     
+    返回:
+        更新后的配置字典（已展平当前提供商），调用方无需重新加载
+    
     异常:
         ValueError: 如果提供商不存在
     
@@ -272,3 +416,4 @@ def switch_provider(name: str):
     
     # 保存配置
     save_config(cfg)
+    return _flatten_current_provider(cfg)
@@ -23,6 +23,8 @@
 """
 
 # ============ 标准库导入 ============
+from collections import UserString
+from functools import lru_cache
 from typing import Dict
 
 # ============ 翻译字典定义 ============
@@ -152,6 +154,10 @@ Please manually configure SSH trust on your control machine:
 # 当前语言，默认为英文
 _CURRENT_LANG = "en"
 
+# 是否已经设置过语言（通常由 load_config 设置）
+# 延迟翻译 LazyT 在语言未设置时会先加载配置
+_LANGUAGE_LOADED = False
+
 
 # ============ 语言切换函数 ============
 
@@ -166,11 +172,41 @@ def set_language(lang: str):
         - 如果传入无效语言代码，不会切换
         - 语言设置保存在内存中，程序退出后重置
     """
-    global _CURRENT_LANG
+    global _CURRENT_LANG, _LANGUAGE_LOADED
+    _LANGUAGE_LOADED = True
     if lang in TRANSLATIONS:
         _CURRENT_LANG = lang
 
 
+def _ensure_language_loaded():
+    """
+    确保界面语言已按配置文件设置
+    
+    首次调用时如果还没有任何模块加载过配置，则加载一次配置
+    （load_config 会调用 set_language）。
+    """
+    if not _LANGUAGE_LOADED:
+        # 延迟导入，避免与 config 模块循环导入
+        from src.core.config import load_config
+        load_config()
+
+
+@lru_cache(maxsize=256)
+def _lookup(lang: str, key: str) -> str:
+    """
+    查询指定语言下 key 对应的原始文本（带缓存）
+    
+    参数:
+        lang: 语言代码
+        key: 翻译文本的 key
+    
+    返回:
+        未格式化的翻译文本，找不到时返回 key 本身
+    """
+    lang_dict = TRANSLATIONS.get(lang, TRANSLATIONS["en"])
+    return lang_dict.get(key, key)
+
+
 # ============ 翻译查询函数 ============
 
 def get_text(key: str, **kwargs) -> str:
@@ -187,8 +223,7 @@ def get_text(key: str, **kwargs) -> str:
     示例:
         t("config_saved", path="/home/user/config")  # 返回: ✅ 配置已保存至 /home/user/config
     """
-    lang_dict = TRANSLATIONS.get(_CURRENT_LANG, TRANSLATIONS["en"])
-    text = lang_dict.get(key, key)
+    text = _lookup(_CURRENT_LANG, key)
     if kwargs:
         return text.format(**kwargs)
     return text
@@ -208,3 +243,26 @@ def t(key: str, **kwargs) -> str:
         翻译后的文本字符串
     """
     return get_text(key, **kwargs)
+
+
+# ============ 延迟翻译 ============
+
+class LazyT(UserString):
+    """
+    延迟翻译的字符串代理
+    
+    在模块导入时（如 Click 装饰器的 help 参数）只记录 key，
+    直到文本真正被使用时才按当前语言查询翻译。
+    
+    示例:
+        @click.group(help=LazyT("cli_desc"))
+    """
+    
+    def __init__(self, key: str):
+        self._key = key
+    
+    @property
+    def data(self) -> str:
+        """按当前语言解析出的文本（必要时先加载配置中的语言设置）"""
+        _ensure_language_loaded()
+        return get_text(self._key)
@@ -11,9 +11,10 @@
 
 日志配置：
 - 日志文件位置：~/.pulao/pulao.log
-- 单文件大小限制：1MB
+- 单文件大小限制：4MB
 - 备份文件数量：5 个
 - 控制台输出：仅 CRITICAL 级别（保持 stdout 干净给 Rich 使用）
+- 文件写入：经 MemoryHandler 批量缓冲，ERROR 及以上立即落盘
 
 异常处理：
 - 如果用户目录不可写，回退到临时目录
@@ -38,6 +39,12 @@ LOG_DIR = CONFIG_DIR
 # 日志文件路径
 LOG_FILE = LOG_DIR / "pulao.log"
 
+# 单个日志文件最大字节数（4MB，减少轮转次数）
+LOG_MAX_BYTES = 4 * 1024 * 1024
+
+# 内存缓冲的日志记录条数（达到后批量写入文件）
+LOG_BUFFER_CAPACITY = 1024
+
 
 # ============ 日志初始化函数 ============
 
@@ -49,7 +56,7 @@ def setup_logging():
     1. 确保日志目录存在
     2. 如果目录不可写，回退到临时目录
     3. 配置日志记录器
-    4. 添加文件处理器（轮转）
+    4. 添加文件处理器（轮转，经内存缓冲批量写入）
     5. 添加控制台处理器（仅 CRITICAL）
     
     日志级别：
@@ -84,11 +91,11 @@ def setup_logging():
         return logger
 
     # 步骤3: 文件处理器（带轮转）
-    # maxBytes=1024*1024: 单文件最大 1MB
+    # maxBytes=LOG_MAX_BYTES: 单文件最大 4MB
     # backupCount=5: 保留 5 个备份文件
     try:
         file_handler = logging.handlers.RotatingFileHandler(
-            LOG_FILE, maxBytes=1024*1024, backupCount=5, encoding="utf-8"
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=5, encoding="utf-8"
         )
     except PermissionError:
         # 文件创建失败，再次回退到临时目录
@@ -96,7 +103,7 @@ def setup_logging():
         LOG_FILE = Path(tempfile.gettempdir()) / "pulao" / "pulao.log"
         LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.handlers.RotatingFileHandler(
-            LOG_FILE, maxBytes=1024*1024, backupCount=5, encoding="utf-8"
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=5, encoding="utf-8"
         )
 
     # 文件日志格式：完整格式，包含时间、名称、级别、消息
@@ -111,8 +118,18 @@ def setup_logging():
     console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setLevel(logging.CRITICAL)
     
+    # 内存缓冲处理器：攒够 LOG_BUFFER_CAPACITY 条或遇到 ERROR 时才写入文件
+    # flushOnClose=True: 进程退出时 logging.shutdown 会刷出剩余记录
+    mem_handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True,
+    )
+    mem_handler.setLevel(logging.DEBUG)
+    
     # 步骤5: 添加处理器到记录器
-    logger.addHandler(file_handler)
+    logger.addHandler(mem_handler)
     logger.addHandler(console_handler)
     
     return logger
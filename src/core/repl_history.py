@@ -0,0 +1,94 @@
+"""
+REPL 输入历史模块
+
+本模块为交互式 REPL 提供持久化且有上限的输入历史：
+1. 历史记录保存在 ~/.pulao/repl_history（跨会话保留）
+2. 文件和内存中最多保留 REPL_HISTORY_MAX 条，超出时丢弃最旧的记录
+3. 历史文件在后台线程加载，不阻塞提示符显示
+
+说明：
+    prompt_toolkit 默认的 InMemoryHistory 会随 REPL 运行无限增长，
+    这里用带上限的 FileHistory + ThreadedHistory 代替。
+"""
+
+# ============ 标准库导入 ============
+import itertools
+from typing import Iterable
+
+# ============ 第三方库导入 ============
+from prompt_toolkit.history import FileHistory, ThreadedHistory
+
+# ============ 本地模块导入 ============
+from src.core.config import CONFIG_DIR  # 配置目录
+
+
+# ============ 常量定义 ============
+
+# REPL 历史文件路径
+REPL_HISTORY_FILE = CONFIG_DIR / "repl_history"
+
+# 最多保留的历史条数
+REPL_HISTORY_MAX = 1000
+
+
+# ============ 有上限的文件历史 ============
+
+class CappedFileHistory(FileHistory):
+    """
+    有上限的文件历史
+
+    加载时只读取最新的 max_entries 条；追加写入的条数超过上限后，
+    将文件压缩为最新的 max_entries 条（先进先出丢弃最旧记录）。
+    """
+
+    def __init__(self, filename, max_entries: int = REPL_HISTORY_MAX):
+        super().__init__(filename)
+        self.max_entries = max_entries
+        self._appended = 0
+
+    def load_history_strings(self) -> Iterable[str]:
+        """加载历史（最新的在前），最多 max_entries 条"""
+        return list(itertools.islice(super().load_history_strings(), self.max_entries))
+
+    def store_string(self, string: str) -> None:
+        """追加一条历史，必要时压缩历史文件"""
+        super().store_string(string)
+        self._appended += 1
+        if self._appended >= self.max_entries:
+            self._compact()
+
+    def _compact(self) -> None:
+        """将历史文件重写为最新的 max_entries 条"""
+        newest_first = self.load_history_strings()
+        with open(self.filename, "wb") as f:
+            for string in reversed(newest_first):
+                for line in string.split("\n"):
+                    f.write(f"+{line}\n".encode("utf-8"))
+                f.write(b"\n")
+        self._appended = 0
+
+
+class CappedThreadedHistory(ThreadedHistory):
+    """
+    后台线程加载的历史，内存中最多保留 max_entries 条
+    """
+
+    def __init__(self, history: CappedFileHistory):
+        super().__init__(history)
+        self.max_entries = history.max_entries
+
+    def append_string(self, string: str) -> None:
+        """添加一条历史，并丢弃内存中超出上限的最旧记录"""
+        super().append_string(string)
+        with self._lock:
+            del self._loaded_strings[self.max_entries:]
+
+
+def create_repl_history() -> CappedThreadedHistory:
+    """
+    创建 REPL 使用的历史对象
+
+    返回:
+        有上限、后台加载的文件历史
+    """
+    return CappedThreadedHistory(CappedFileHistory(str(REPL_HISTORY_FILE)))
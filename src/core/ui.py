@@ -18,12 +18,11 @@
 """
 
 # ============ 第三方库导入 ============
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
+from rich.rule import Rule
 from rich.table import Table
 from rich.text import Text
-from rich.layout import Layout
-from rich import box
 
 # ============ 本地模块导入 ============
 from src import __version__  # 项目版本号
@@ -43,52 +42,73 @@ PULAO_LOGO = r"""
  |_|    \__,_|_|\__,_|\___/ 
 """
 
+# Logo 文本对象（静态，模块加载时构建一次，每次绘制头部复用）
+_LOGO_TEXT = Text(PULAO_LOGO, style="bold cyan")
 
-# ============ 界面渲染函数 ============
 
-def print_header(cfg):
+# ============ 命令帮助（静态） ============
+
+# 可用命令列表：(命令, 说明)
+COMMANDS = [
+    ("! <command>", "Execute shell command (e.g., '!ls') / 执行系统命令"),
+    ("deploy <instruction>", "Deploy middleware (e.g., 'deploy redis') / 部署中间件"),
+    ("llm <action>", "Manage LLM: config/list/use/add / 管理大模型配置"),
+    ("update-library", "Update template library from GitHub / 更新模板库"),
+    ("exit / quit", "Exit Pulao / 退出"),
+]
+
+
+def _build_commands_help() -> Group:
     """
-    打印程序顶部标题栏
+    构建命令帮助渲染对象（标题 + 命令表格 + 分隔线）
     
-    显示内容包括：
-    1. ASCII Logo
-    2. 当前配置信息（版本、提供商、模型、语言）
-    3. 可用命令列表
+    内容与配置无关，模块加载时只构建一次。
     
-    参数:
-        cfg: 配置字典，包含 current_provider, model, language 等信息
+    返回:
+        Rich Group 对象
+    """
+    # 命令列表标题
+    commands_title = Text("Available Commands / 可用命令:", style="bold white")
     
-    布局说明：
-        - 左侧：ASCII Logo（青色粗体）
-        - 右侧：信息表格（蓝色标签，黄色值）
-        - 底部：命令帮助列表
+    # 创建命令表格
+    cmd_table = Table(box=None, show_header=False, padding=(0, 2), expand=True)
+    cmd_table.add_column(style="bold green", width=25)
+    cmd_table.add_column(style="white")
+    for cmd, desc in COMMANDS:
+        cmd_table.add_row(f"• {cmd}", desc)
     
-    命令列表：
-        - ! <command>: 执行 Shell 命令
-        - deploy <instruction>: 部署中间件
-        - config / setup: 配置提供商
-        - providers: 列出所有提供商
-        - use <name>: 切换提供商
-        - add-provider <name>: 添加提供商
-        - update-library: 更新模板库
-        - exit / quit: 退出程序
+    # 分隔线（渲染时按终端宽度绘制）
+    separator = Rule(style="dim blue")
+    
+    return Group(commands_title, cmd_table, separator)
+
+
+_COMMANDS_HELP = _build_commands_help()
+
+
+# ============ 界面渲染函数 ============
+
+# 上一次绘制头部时的 (提供商, 模型, 语言)，用于跳过重复绘制
+_last_header_key = None
+
+
+def _build_header_panel(current_provider: str, model: str, language: str) -> Panel:
     """
-    # 清空控制台
-    console.clear()
+    构建顶部信息面板（Logo + 版本/提供商/模型/语言）
     
-    # 获取当前配置信息
-    current_provider = cfg.get("current_provider", "default")
-    model = cfg.get("model", "unknown")
-    language = cfg.get("language", "en")
+    参数:
+        current_provider: 当前提供商名称
+        model: 模型名称
+        language: 界面语言
     
+    返回:
+        Rich Panel 对象
+    """
     # 创建网格布局（无边框）
     grid = Table.grid(expand=True)
     grid.add_column(justify="left", ratio=1)
     grid.add_column(justify="right", ratio=1)
     
-    # 左侧：ASCII Logo
-    logo_text = Text(PULAO_LOGO, style="bold cyan")
-    
     # 右侧：信息表格
     info_table = Table.grid(padding=(0, 2))
     info_table.add_column(justify="right", style="bold blue")
@@ -101,10 +121,10 @@ def print_header(cfg):
     info_table.add_row("Language :", language)
     
     # 组合左右两部分
-    grid.add_row(logo_text, info_table)
+    grid.add_row(_LOGO_TEXT, info_table)  # 左侧：ASCII Logo
     
     # 包装成面板
-    header_panel = Panel(
+    return Panel(
         grid,
         style="blue",
         border_style="cyan",
@@ -112,31 +132,59 @@ def print_header(cfg):
         title_align="center",
         padding=(0, 2)
     )
+
+
+def print_header(cfg):
+    """
+    打印程序顶部标题栏
     
-    console.print(header_panel)
+    显示内容包括：
+    1. ASCII Logo
+    2. 当前配置信息（版本、提供商、模型、语言）
+    3. 可用命令列表
     
-    # 显示命令列表标题
-    console.print(Text("Available Commands / 可用命令:", style="bold white"))
+    参数:
+        cfg: 配置字典，包含 current_provider, model, language 等信息
     
-    # 创建命令表格
-    cmd_table = Table(box=None, show_header=False, padding=(0, 2), expand=True)
-    cmd_table.add_column(style="bold green", width=25)
-    cmd_table.add_column(style="white")
+    绘制策略：
+        - 首次调用：清屏并绘制完整头部（信息面板 + 命令列表 + 分隔线）
+        - 配置未变化：直接返回，不清屏也不重绘
+        - 配置变化：不清屏，只在当前位置输出更新后的信息面板
     
-    # 定义命令列表
-    commands = [
-        ("! <command>", "Execute shell command (e.g., '!ls') / 执行系统命令"),
-        ("deploy <instruction>", "Deploy middleware (e.g., 'deploy redis') / 部署中间件"),
-        ("llm <action>", "Manage LLM: config/list/use/add / 管理大模型配置"),
-        ("update-library", "Update template library from GitHub / 更新模板库"),
-        ("exit / quit", "Exit Pulao / 退出")
-    ]
-    
-    # 添加命令到表格
-    for cmd, desc in commands:
-        cmd_table.add_row(f"• {cmd}", desc)
-        
-    console.print(cmd_table)
+    布局说明：
+        - 左侧：ASCII Logo（青色粗体）
+        - 右侧：信息表格（蓝色标签，黄色值）
+        - 底部：命令帮助列表
+    
+    命令列表：
+        - ! <command>: 执行 Shell 命令
+        - deploy <instruction>: 部署中间件
+        - llm <action>: 管理大模型配置
+        - update-library: 更新模板库
+        - exit / quit: 退出程序
+    """
+    global _last_header_key
+    
+    # 获取当前配置信息
+    key = (
+        cfg.get("current_provider", "default"),
+        cfg.get("model", "unknown"),
+        cfg.get("language", "en"),
+    )
     
-    # 分隔线
-    console.print(Text("─" * console.width, style="dim blue"))
+    # 配置未变化，跳过重绘
+    if key == _last_header_key:
+        return
+    
+    first_paint = _last_header_key is None
+    _last_header_key = key
+    header_panel = _build_header_panel(*key)
+    
+    # 配置变化：只输出更新后的信息面板，避免整屏清除和重绘
+    if not first_paint:
+        console.print(header_panel)
+        return
+    
+    # 首次绘制：清空控制台，并与静态命令帮助一起一次性输出
+    console.clear()
+    console.print(Group(header_panel, _COMMANDS_HELP))
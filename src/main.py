@@ -2,37 +2,35 @@
 Pulao 主入口模块
 
 本模块是 Pulao 应用的入口点，负责：
-1. 构建 CLI 命令行界面（使用 Typer 框架）
+1. 构建 CLI 命令行界面（使用 Click 框架）
 2. 实现交互式 REPL 循环
 3. 注册并处理所有子命令（配置、部署、集群管理等）
 
 依赖模块：
-    - typer: CLI 框架
+    - click: CLI 框架
     - rich: 终端美化输出
     - prompt_toolkit: 交互式输入
 """
 
 # ============ 标准库导入 ============
 import sys
-from typing import Optional
 
 # ============ 第三方库导入 ============
-import typer
-from rich.console import Console
-from rich.prompt import Prompt
-from rich.panel import Panel
-from rich.text import Text
+# 注意：rich.prompt 和 prompt_toolkit 只在交互函数内部导入，
+# 以缩短非交互命令的启动时间
+import click
 
 # ============ 本地模块导入 ============
 from src.core.config import (
     load_config, 
     save_config, 
     add_provider as add_provider_to_config, 
-    switch_provider
+    switch_provider,
+    get_provider_names
 )
-from src.core.i18n import t  # 国际化翻译函数
+from src.core.i18n import t, LazyT  # 国际化翻译函数
 from src import __version__  # 项目版本号
-from src.core.ui import print_header  # 打印头部 UI
+from src.core.ui import console, print_header  # 共享控制台对象、打印头部 UI
 from src.tools.system.system_ops import execute_shell_command  # 执行 Shell 命令
 from src.core.logger import setup_logging  # 日志系统初始化
 
@@ -41,33 +39,100 @@ from src.core.logger import setup_logging  # 日志系统初始化
 logger = setup_logging()
 
 # ============ Readline 导入 ============
-# 尝试导入 readline 以支持命令行历史记录和光标移动
+# 尝试导入 readline 以支持 input()（如 Rich Prompt）的光标移动
 # 如果不可用，尝试 gnureadline（Windows 兼容）
 # 如果都没有，则使用默认的 input()
+# REPL 历史由 prompt_toolkit 管理，这里关闭 readline 的历史记录，
+# 避免 API Key 等配置输入进入历史且历史无限增长
 try:
     import readline
 except ImportError:
     try:
         import gnureadline as readline
     except ImportError:
-        pass
+        readline = None
 
-# ============ 预加载配置 ============
-# 在应用启动时加载配置，确保所有命令都能访问配置信息
-load_config()
+if readline is not None:
+    if hasattr(readline, "set_auto_history"):
+        readline.set_auto_history(False)
+    readline.set_history_length(0)
 
-# ============ 应用初始化 ============
-# 创建 Typer 应用实例
-# help 参数显示 CLI 描述（从 i18n 翻译中获取）
-app = typer.Typer(help=t("cli_desc"), invoke_without_command=True)
+# ============ REPL 命令处理结果 ============
+# 命令处理函数的返回值：继续循环 / 退出循环
+CONTINUE = "continue"
+BREAK = "break"
+
+
+# ============ AI 处理模块（延迟加载） ============
+# 缓存 process_deployment 的引用；只有用户第一次发出部署指令时才导入
+# src.agent.orchestrator（会加载 LangChain / OpenAI / ChromaDB 等重量级依赖）
+_process_deployment = None
+
+
+def _get_process_deployment():
+    """
+    获取 process_deployment 函数（首次调用时导入并缓存）
+    
+    返回:
+        src.agent.orchestrator.process_deployment
+    """
+    global _process_deployment
+    if _process_deployment is None:
+        from src.agent.orchestrator import process_deployment
+        _process_deployment = process_deployment
+    return _process_deployment
+
+
+# ============ REPL 样式（单例） ============
+_STYLE = None
+
+
+def _get_style():
+    """
+    获取 REPL 的 prompt_toolkit 样式（首次调用时构建并缓存）
+    
+    返回:
+        prompt_toolkit Style 对象
+    """
+    global _STYLE
+    if _STYLE is None:
+        from prompt_toolkit.styles import Style
+        _STYLE = Style.from_dict({
+            'bottom-toolbar': '#aaaaaa bg:#333333',  # 底部工具栏样式
+            'prompt': 'ansicyan bold',  # 提示符样式（青色加粗）
+        })
+    return _STYLE
 
-# 创建 Rich 控制台对象，用于彩色输出
-console = Console()
+
+# ============ 是/否确认 ============
+def _ask_yes_no(question: str) -> bool:
+    """
+    询问一个是/否问题
+    
+    终端中直接读取一行并取首字母判断，不经过 Rich 的渲染和选项校验循环；
+    非终端输入（脚本调用）时回退到 Rich Prompt。
+    
+    参数:
+        question: 问题文本
+    
+    返回:
+        用户回答 y 时返回 True，否则返回 False
+    """
+    if not sys.stdin.isatty():
+        from rich.prompt import Prompt
+        return Prompt.ask(question, choices=["y", "n"]) == "y"
+    
+    sys.stdout.write(f"{question} [y/n]: ")
+    sys.stdout.flush()
+    return sys.stdin.readline().strip()[:1].lower() == "y"
 
 
-# ============ 主回调函数 ============
-@app.callback(invoke_without_command=True)
-def main(ctx: typer.Context):
+# ============ 应用初始化 / 主回调函数 ============
+# 直接使用 Click 命令组（不经过 Typer 的类型注解反射）
+# help 参数显示 CLI 描述（从 i18n 翻译中获取）
+@click.group(help=LazyT("cli_desc"), invoke_without_command=True)
+@click.pass_context
+def app(ctx: click.Context):
     """
     Pulao 主入口回调函数
     
@@ -75,17 +140,191 @@ def main(ctx: typer.Context):
     它会启动交互式 REPL 循环，让用户输入自然语言指令。
     
     参数:
-        ctx: Typer 上下文对象，包含命令行参数信息
+        ctx: Click 上下文对象，包含命令行参数信息
     """
     if ctx.invoked_subcommand is None:
         repl_loop()
 
 
-# ============ Prompt Toolkit 导入 ============
-# 延迟导入以避免启动时的性能开销
-from prompt_toolkit import PromptSession
-from prompt_toolkit.styles import Style
-from prompt_toolkit.formatted_text import HTML
+# ============ REPL 命令处理函数 ============
+# 处理函数签名：handler(state, args) -> CONTINUE / BREAK（返回 None 视为 CONTINUE）
+#   state: REPL 状态字典 {"cfg": 当前配置, "interactive": 是否终端, "error_label": 错误前缀}
+#   args:  命令名之后的参数字符串（已去除首尾空白，可能为空）
+
+def _refresh_header(state):
+    """交互模式下按当前配置刷新头部（未变化时 print_header 自行跳过）"""
+    if state["interactive"]:
+        print_header(state["cfg"])
+
+
+def _cmd_exit(state, args):
+    """exit / quit：退出 REPL"""
+    console.print("Bye!")
+    return BREAK
+
+
+def _llm_config(state, args):
+    """llm config：配置当前模型"""
+    state["cfg"] = config()
+    _refresh_header(state)
+
+
+def _llm_list(state, args):
+    """llm list：列出所有模型配置"""
+    providers()
+
+
+def _llm_use(state, args):
+    """llm use <name>：切换模型配置"""
+    if not args:
+        console.print("[red]Usage: llm use <name>[/red]")
+        return
+    new_cfg = use(args.split(None, 1)[0])
+    if new_cfg is not None:
+        state["cfg"] = new_cfg
+        _refresh_header(state)
+
+
+def _llm_add(state, args):
+    """llm add <name>：添加新模型配置"""
+    if not args:
+        console.print("[red]Usage: llm add <name>[/red]")
+        return
+    state["cfg"] = add_provider(args.split(None, 1)[0])
+    # 添加第一个自定义提供商时可能自动切换，按返回的配置刷新头部
+    _refresh_header(state)
+
+
+# llm 子命令分发表（模块加载时构建一次）
+_LLM_COMMANDS = {
+    "config": _llm_config,
+    "list": _llm_list,
+    "use": _llm_use,
+    "add": _llm_add,
+}
+
+
+def _cmd_llm(state, args):
+    """llm：管理大模型配置（config/list/use/add）"""
+    if not args:
+        console.print("[red]Usage: llm <config|list|use|add> [args][/red]")
+        console.print("  config      : 配置当前模型")
+        console.print("  list        : 列出所有模型配置")
+        console.print("  use <name>  : 切换模型配置")
+        console.print("  add <name>  : 添加新模型配置")
+        return CONTINUE
+    
+    llm_cmd, _, sub_args = _split_command(args)
+    handler = _LLM_COMMANDS.get(llm_cmd)
+    if handler is None:
+        console.print(f"[red]Unknown llm command: {llm_cmd}[/red]")
+        console.print("Valid commands: config, list, use, add")
+        return CONTINUE
+    
+    try:
+        handler(state, sub_args)
+    except Exception as e:
+        console.print(f"[bold red]Error in 'llm {llm_cmd}':[/bold red] {e}")
+    return CONTINUE
+
+
+# 顶层命令分发表（未命中的输入作为部署指令交给 AI 处理）
+_REPL_COMMANDS = {
+    "exit": _cmd_exit,
+    "quit": _cmd_exit,
+    "llm": _cmd_llm,
+}
+
+
+def _split_command(text: str):
+    """
+    单次扫描切出第一个词（小写）和剩余参数
+    
+    参数:
+        text: 已去除首尾空白的非空文本
+    
+    返回:
+        (命令名小写, 分隔符, 剩余参数字符串)
+    """
+    head = text.split(None, 1)
+    if len(head) == 1:
+        return head[0].lower(), "", ""
+    return head[0].lower(), " ", head[1]
+
+
+def _invalidate_system_info():
+    """
+    Shell 命令可能改变容器/端口状态，使系统提示词中的本机信息缓存失效
+    
+    提示词模块尚未加载时没有缓存，无需处理（避免在这里引入其依赖）。
+    """
+    prompts = sys.modules.get("src.agent.prompts")
+    if prompts is not None:
+        prompts.invalidate_system_info_cache()
+
+
+def _handle_line(state, instruction):
+    """
+    处理一行已去除首尾空白的非空输入
+    
+    参数:
+        state: REPL 状态字典
+        instruction: 用户输入
+    
+    返回:
+        CONTINUE 或 BREAK
+    """
+    # ============ Shell 命令处理 ============
+    # 以 ! 开头的指令被识别为 Shell 命令
+    if instruction[0] == "!":
+        cmd = instruction[1:].strip()  # 去掉 ! 和空白
+        if cmd:
+            execute_shell_command(cmd)  # 执行 Shell 命令
+            _invalidate_system_info()
+        return CONTINUE
+
+    # ============ 命令分发 ============
+    # 只切出第一个词查表，参数字符串交给处理函数按需解析；
+    # 自然语言指令（最常见的情况）不做整行分割
+    cmd_name, _, args = _split_command(instruction)
+    handler = _REPL_COMMANDS.get(cmd_name)
+    if handler is not None:
+        return handler(state, args)
+        
+    # ============ 部署指令 ============
+    # 其他所有输入都被视为部署/运维指令，发送给 AI 处理
+    try:
+        _get_process_deployment()(instruction, state["cfg"])
+    except Exception as e:
+        console.print(f"{state['error_label']} {str(e)}")
+    return CONTINUE
+
+
+# ============ 非交互批处理循环 ============
+def _batch_loop(state):
+    """
+    逐行处理非终端输入（脚本/管道）
+    
+    使用 sys.stdin.readline 读取，与 input()（如 Rich Prompt）共享同一缓冲，
+    因此批处理中的 llm config 等交互命令也能从后续行读取回答。
+    
+    参数:
+        state: REPL 状态字典
+    """
+    while True:
+        raw = sys.stdin.readline()
+        if not raw:
+            break  # EOF
+        instruction = raw.strip()
+        if not instruction:
+            continue
+        try:
+            if _handle_line(state, instruction) == BREAK:
+                break
+        except KeyboardInterrupt:
+            break
+        except Exception as e:
+            console.print(f"[bold red]System Error:[/bold red] {e}")
 
 
 # ============ 交互式 REPL 循环 ============
@@ -120,131 +359,89 @@ def repl_loop():
     if not cfg["api_key"]:
         console.print(f"[yellow]{t('api_key_missing')}[/yellow]")
         # 询问用户是否立即配置
-        if Prompt.ask("Do you want to configure now? / 是否立即配置?", choices=["y", "n"]) == "y":
-            config()  # 调用配置命令
-            cfg = load_config()  # 重新加载配置
+        if _ask_yes_no("Do you want to configure now? / 是否立即配置?"):
+            cfg = config()  # 调用配置命令，返回更新后的配置
         else:
             return  # 用户取消，返回退出
     
-    # 延迟导入 AI 处理模块，避免启动时不必要的开销
-    from src.agent.orchestrator import process_deployment
+    # REPL 状态：处理函数通过它读取/替换当前配置
+    state = {
+        "cfg": cfg,
+        # stdin 是否为终端（否则进入逐行批处理模式）
+        "interactive": sys.stdin.isatty(),
+        # REPL 中不会修改语言设置，错误提示前缀只需查询一次
+        "error_label": f"[bold red]{t('error_prefix')}[/bold red]",
+    }
     
     # ============ 打印头部信息 ============
-    # 显示 ASCII Logo 和当前配置信息
-    print_header(cfg)
+    # 显示 ASCII Logo 和当前配置信息（非终端输入时不打印）
+    _refresh_header(state)
+
+    # ============ 非交互模式 ============
+    # stdin 不是终端（如 echo "llm list" | pulao）时逐行处理，
+    # 不初始化 prompt_toolkit 会话、样式和工具栏
+    if not state["interactive"]:
+        _batch_loop(state)
+        return
 
     # ============ Prompt Session 设置 ============
     # 配置 prompt_toolkit 会话，支持命令历史和底部工具栏
-    style = Style.from_dict({
-        'bottom-toolbar': '#aaaaaa bg:#333333',  # 底部工具栏样式
-        'prompt': 'ansicyan bold',  # 提示符样式（青色加粗）
-    })
+    # 延迟导入交互相关模块，避免非交互命令的启动开销
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.formatted_text import HTML
+    
+    # 底部工具栏缓存：只有提供商或模型变化时才重新构建 HTML
+    toolbar_cache = {"cfg": None, "key": None, "html": None}
     
     def get_bottom_toolbar():
         """
         获取底部工具栏内容
         
         显示当前 AI 提供商、模型名称和退出提示。
-        每次提示符显示时都会调用此函数，以反映最新的配置信息。
+        每次重绘都会调用此函数；配置字典未被替换时直接返回缓存，
+        切换配置（cfg 被重新加载）后才读取字段并按需重新构建。
         
         返回:
             HTML 格式的字符串，显示在终端底部
         """
-        provider = cfg.get("current_provider", "default")
-        model = cfg.get("model", "unknown")
-        return HTML(f' <b>Provider:</b> {provider} | <b>Model:</b> {model} | <b>Exit:</b> Ctrl+D ')
+        cfg = state["cfg"]
+        if toolbar_cache["cfg"] is cfg:
+            return toolbar_cache["html"]
+        
+        # 配置已重新加载：一次性读取需要的字段
+        toolbar_cache["cfg"] = cfg
+        key = (cfg.get("current_provider", "default"), cfg.get("model", "unknown"))
+        if toolbar_cache["key"] != key:
+            toolbar_cache["html"] = HTML(f' <b>Provider:</b> {key[0]} | <b>Model:</b> {key[1]} | <b>Exit:</b> Ctrl+D ')
+            toolbar_cache["key"] = key
+        return toolbar_cache["html"]
 
-    # 创建 Prompt Session
-    session = PromptSession(style=style)
+    # 创建 Prompt Session（使用有上限的持久化历史）
+    from src.core.repl_history import create_repl_history
+    # 提示符和底部工具栏在创建会话时设置一次；refresh_interval=0 关闭定时重绘，
+    # 工具栏只在按键/窗口变化等真正需要时重绘
+    session = PromptSession(
+        message=HTML('<b>&gt;</b> '),
+        bottom_toolbar=get_bottom_toolbar,
+        refresh_interval=0,
+        style=_get_style(),
+        history=create_repl_history(),
+    )
 
     # ============ 主循环 ============
     while True:
         try:
-            # 获取用户输入
-            # 使用 prompt_toolkit 显示底部工具栏
-            instruction = session.prompt(
-                HTML('<b>&gt;</b> '), 
-                bottom_toolbar=get_bottom_toolbar
-            )
+            # 获取用户输入（提示符和底部工具栏已在会话中配置）
+            raw = session.prompt()
+            instruction = raw.strip()
             
             # 忽略空输入
-            if not instruction.strip():
+            if not instruction:
                 continue
             
-            # ============ Shell 命令处理 ============
-            # 以 ! 开头的指令被识别为 Shell 命令
-            if instruction.strip().startswith("!"):
-                cmd = instruction.strip()[1:].strip()  # 去掉 ! 和空白
-                if cmd:
-                    execute_shell_command(cmd)  # 执行 Shell 命令
-                continue
-
-            # ============ 命令解析 ============
-            # 将输入分割为命令和参数
-            cmd_parts = instruction.strip().split()
-            cmd_name = cmd_parts[0].lower()  # 命令名称（小写）
-            
-            # ============ 退出命令 ============
-            if cmd_name in ["exit", "quit"]:
-                console.print("Bye!")
+            if _handle_line(state, instruction) == BREAK:
                 break
                 
-            # ============ LLM 管理命令 ============
-            # llm：管理大模型配置（config/list/use/add）
-            if cmd_name == "llm":
-                if len(cmd_parts) < 2:
-                    console.print("[red]Usage: llm <config|list|use|add> [args][/red]")
-                    console.print("  config      : 配置当前模型")
-                    console.print("  list        : 列出所有模型配置")
-                    console.print("  use <name>  : 切换模型配置")
-                    console.print("  add <name>  : 添加新模型配置")
-                    continue
-                
-                llm_cmd = cmd_parts[1].lower()
-                
-                if llm_cmd == "config":
-                    try:
-                        config()
-                        cfg = load_config()
-                        print_header(cfg)
-                    except Exception as e:
-                        console.print(f"[bold red]Error in 'llm config':[/bold red] {e}")
-                elif llm_cmd == "list":
-                    try:
-                        providers()
-                    except Exception as e:
-                        console.print(f"[bold red]Error in 'llm list':[/bold red] {e}")
-                elif llm_cmd == "use":
-                    if len(cmd_parts) < 3:
-                        console.print("[red]Usage: llm use <name>[/red]")
-                        continue
-                    try:
-                        use(cmd_parts[2])
-                        cfg = load_config()
-                        print_header(cfg)
-                    except Exception as e:
-                        console.print(f"[bold red]Error in 'llm use':[/bold red] {e}")
-                elif llm_cmd == "add":
-                    if len(cmd_parts) < 3:
-                        console.print("[red]Usage: llm add <name>[/red]")
-                        continue
-                    try:
-                        add_provider(cmd_parts[2])
-                        cfg = load_config()
-                    except Exception as e:
-                        console.print(f"[bold red]Error in 'llm add':[/bold red] {e}")
-                else:
-                    console.print(f"[red]Unknown llm command: {llm_cmd}[/red]")
-                    console.print("Valid commands: config, list, use, add")
-                continue
-                
-            # ============ 部署指令 ============
-            # 其他所有输入都被视为部署/运维指令，发送给 AI 处理
-            try:
-                process_deployment(instruction, cfg)
-            except Exception as e:
-                console.print(f"[bold red]{t('error_prefix')}[/bold red] {str(e)}")
-                
         except KeyboardInterrupt:
             # Ctrl+C 中断，只是继续循环
             continue
@@ -271,22 +468,19 @@ def providers():
     current = cfg.get("current_provider", "default")
     providers_dict = cfg.get("providers", {})
     
-    console.print("[bold]Configured LLMs / 已配置的大模型:[/bold]")
+    lines = ["[bold]Configured LLMs / 已配置的大模型:[/bold]"]
     
-    # 排序：default 排在最前面，其余按字母顺序
-    names = sorted(providers_dict.keys())
-    if "default" in names:
-        names.remove("default")
-        names.insert(0, "default")
-        
-    # 遍历显示每个配置的信息
-    for idx, name in enumerate(names, 1):
+    # 遍历收集每个配置的信息（顺序：default 在最前，其余按字母顺序）
+    for idx, name in enumerate(get_provider_names(), 1):
         details = providers_dict[name]
         status = "[green]* (current)[/green]" if name == current else ""
-        console.print(f"  {idx}. [cyan]{name}[/cyan] {status}")
-        console.print(f"     Base URL: {details.get('base_url')}")
-        console.print(f"     Model:    {details.get('model')}")
-        console.print("")
+        lines.append(f"  {idx}. [cyan]{name}[/cyan] {status}")
+        lines.append(f"     Base URL: {details.get('base_url')}")
+        lines.append(f"     Model:    {details.get('model')}")
+        lines.append("")
+    
+    # 一次性输出，减少渲染和写入次数
+    console.print("\n".join(lines))
 
 
 # ============ 内部函数：添加新的 LLM 配置 ============
@@ -300,7 +494,12 @@ def add_provider(name: str):
     - Model（模型名称）
     
     通过 llm add <name> 命令调用。
+    
+    返回:
+        更新后的配置字典
     """
+    from rich.prompt import Prompt
+    
     console.print(f"[bold blue]Adding LLM Config: {name}[/bold blue]")
     # 交互式输入各项配置
     api_key = Prompt.ask(t("enter_api_key"), password=True)
@@ -308,8 +507,9 @@ def add_provider(name: str):
     model = Prompt.ask(t("enter_model"))
     
     # 调用配置模块保存配置信息
-    path = add_provider_to_config(name, api_key, base_url, model)
+    cfg = add_provider_to_config(name, api_key, base_url, model)
     console.print(f"[green]LLM config '{name}' added successfully.[/green]")
+    return cfg
 
 
 # ============ 内部函数：切换 LLM 配置 ============
@@ -322,15 +522,12 @@ def use(name_or_index: str):
     2. 按索引：如 "llm use 1"（对应 llm list 显示的顺序）
     
     通过 llm use <name> 命令调用。
-    """
-    cfg = load_config()
-    providers_dict = cfg.get("providers", {})
     
-    # 准备索引查找列表
-    names = sorted(providers_dict.keys())
-    if "default" in names:
-        names.remove("default")
-        names.insert(0, "default")
+    返回:
+        切换后的配置字典；切换失败时返回 None
+    """
+    # 索引查找列表（与 llm list 的显示顺序一致，随配置缓存）
+    names = get_provider_names()
     
     target_name = name_or_index
     
@@ -341,13 +538,15 @@ def use(name_or_index: str):
             target_name = names[idx - 1]
         else:
             console.print(f"[red]Invalid index: {idx}. Valid range: 1-{len(names)}[/red]")
-            return
+            return None
 
     try:
-        switch_provider(target_name)
+        cfg = switch_provider(target_name)
         console.print(f"[green]Switched to LLM: {target_name}[/green]")
+        return cfg
     except ValueError as e:
         console.print(f"[red]{str(e)}[/red]")
+        return None
 
 
 # ============ 内部函数：配置当前 LLM ============
@@ -361,7 +560,12 @@ def config():
     - Model：使用的模型名称
     
     通过 llm config 命令调用。
+    
+    返回:
+        更新后的配置字典
     """
+    from rich.prompt import Prompt
+    
     # 重新加载配置，确保语言设置正确
     current_config = load_config()
     current_provider_name = current_config.get("current_provider", "default")
@@ -374,8 +578,9 @@ def config():
     model = Prompt.ask(t("enter_model"), default=current_config["model"])
     
     # 保存到当前配置
-    add_provider_to_config(current_provider_name, api_key, base_url, model)
+    cfg = add_provider_to_config(current_provider_name, api_key, base_url, model)
     console.print(f"[green]{t('config_saved', path='config.yaml')}[/green]")
+    return cfg
 
 
 # ============ 程序入口 ============
@@ -384,6 +589,11 @@ if __name__ == "__main__":
     主程序入口点
     
     当直接运行 python main.py 时触发。
-    会调用 Typer 的 app() 方法启动 CLI 应用。
+    不带任何参数时（最常见的用法）直接进入 REPL，
+    跳过 Click 的参数解析和帮助文本构建；
+    其他情况调用 Click 的 app() 方法启动 CLI 应用。
     """
-    app()
+    if len(sys.argv) == 1:
+        repl_loop()
+    else:
+        app()
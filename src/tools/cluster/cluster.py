@@ -19,7 +19,8 @@
 
 # ============ 标准库导入 ============
 import os
-import yaml
+import copy
+import json
 from pathlib import Path
 from typing import List, Dict, Optional
 
@@ -27,10 +28,16 @@ from typing import List, Dict, Optional
 from rich.console import Console
 from rich.table import Table
 
+# orjson 为可选依赖（C 实现，序列化更快），不可用时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ============ 本地模块导入 ============
 from src.tools.cluster.remote_ops import RemoteExecutor  # SSH 连接检查
 from src.core.i18n import t  # 国际化翻译函数
-from src.core.config import CONFIG_DIR  # 配置目录
+from src.core.config import CONFIG_DIR, file_stamp, yaml_load, yaml_dump  # 配置目录、文件状态戳、YAML 读写
 
 # 创建 Rich 控制台对象
 console = Console()
@@ -51,6 +58,31 @@ DEFAULT_CLUSTERS_CONFIG = {
 }
 
 
+# ============ 配置缓存 ============
+
+# 集群配置缓存：文件状态戳、解析结果、当前集群节点的 JSON 文本
+# 只有 clusters.yaml 的 mtime 或大小变化时才重新解析
+_CLUSTERS_CACHE: Dict = {"stamp": None, "config": None, "nodes_json": None}
+
+
+def _dump_nodes(nodes: List[Dict]) -> str:
+    """
+    将节点列表格式化为缩进 JSON（优先使用 orjson）
+    
+    参数:
+        nodes: 节点列表
+    
+    返回:
+        JSON 字符串
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(nodes, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # 含 orjson 不支持的类型时回退到标准库
+    return json.dumps(nodes, indent=2, ensure_ascii=False)
+
+
 # ============ 集群管理器类 ============
 
 class ClusterManager:
@@ -64,22 +96,47 @@ class ClusterManager:
     # ============ 配置加载/保存方法 ============
     
     @staticmethod
-    def load_config() -> Dict:
+    def _cached_config() -> Dict:
+        """
+        获取缓存的集群配置（文件变化时重新加载）
+        
+        返回:
+            缓存中的配置字典（调用方不得修改）
         """
-        加载集群配置
+        stamp = (str(CLUSTERS_FILE), file_stamp(CLUSTERS_FILE))
+        if _CLUSTERS_CACHE["config"] is None or _CLUSTERS_CACHE["stamp"] != stamp:
+            _CLUSTERS_CACHE["config"] = ClusterManager._load_config_from_file()
+            _CLUSTERS_CACHE["nodes_json"] = None
+            _CLUSTERS_CACHE["stamp"] = stamp
+        return _CLUSTERS_CACHE["config"]
+
+    @staticmethod
+    def _load_config_from_file() -> Dict:
+        """
+        从文件加载集群配置（不使用缓存）
         
         返回:
             集群配置字典
         """
         if not CLUSTERS_FILE.exists():
-            return DEFAULT_CLUSTERS_CONFIG.copy()
+            return copy.deepcopy(DEFAULT_CLUSTERS_CONFIG)
         
         try:
             with open(CLUSTERS_FILE, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or DEFAULT_CLUSTERS_CONFIG.copy()
+                return yaml_load(f) or copy.deepcopy(DEFAULT_CLUSTERS_CONFIG)
         except Exception as e:
             console.print(f"[bold red]Failed to load clusters config:[/bold red] {e}")
-            return DEFAULT_CLUSTERS_CONFIG.copy()
+            return copy.deepcopy(DEFAULT_CLUSTERS_CONFIG)
+
+    @staticmethod
+    def load_config() -> Dict:
+        """
+        加载集群配置（带缓存）
+        
+        返回:
+            集群配置字典（副本，调用方可以自由修改）
+        """
+        return copy.deepcopy(ClusterManager._cached_config())
 
     @staticmethod
     def save_config(config: Dict):
@@ -91,7 +148,11 @@ class ClusterManager:
         """
         CLUSTERS_FILE.parent.mkdir(parents=True, exist_ok=True)
         with open(CLUSTERS_FILE, "w", encoding="utf-8") as f:
-            yaml.dump(config, f, default_flow_style=False)
+            yaml_dump(config, f, default_flow_style=False)
+        
+        # 配置已变更，使缓存失效
+        _CLUSTERS_CACHE["config"] = None
+        _CLUSTERS_CACHE["nodes_json"] = None
 
     # ============ 集群操作方法 ============
     
@@ -103,7 +164,7 @@ class ClusterManager:
         返回:
             当前集群名称字符串
         """
-        cfg = ClusterManager.load_config()
+        cfg = ClusterManager._cached_config()
         return cfg.get("current_cluster", "default")
 
     @staticmethod
@@ -114,11 +175,33 @@ class ClusterManager:
         返回:
             节点字典列表
         """
-        cfg = ClusterManager.load_config()
+        return copy.deepcopy(ClusterManager._current_nodes())
+
+    @staticmethod
+    def _current_nodes() -> List[Dict]:
+        """
+        获取当前集群的节点列表（缓存中的对象，调用方不得修改）
+        """
+        cfg = ClusterManager._cached_config()
         current = cfg.get("current_cluster", "default")
         clusters = cfg.get("clusters", {})
         return clusters.get(current, {}).get("nodes", [])
 
+    @staticmethod
+    def get_current_nodes_json() -> str:
+        """
+        获取当前集群节点列表的 JSON 文本（用于系统提示词）
+        
+        序列化结果随配置一起缓存，只有 clusters.yaml 变化时才重新生成。
+        
+        返回:
+            缩进 JSON 字符串，当前集群没有节点时返回空字符串
+        """
+        nodes = ClusterManager._current_nodes()
+        if _CLUSTERS_CACHE["nodes_json"] is None:
+            _CLUSTERS_CACHE["nodes_json"] = _dump_nodes(nodes) if nodes else ""
+        return _CLUSTERS_CACHE["nodes_json"]
+
     @staticmethod
     def list_clusters() -> str:
         """
@@ -6,7 +6,7 @@
 主要功能：
 1. SSH 连接检查
 2. 远程命令执行
-3. 文件上传（SCP）
+3. 文件上传（SCP / SSH 标准输入）
 4. 远程 Docker 部署
 
 异常类：
@@ -19,17 +19,71 @@
 # ============ 标准库导入 ============
 import subprocess
 import os
-import tempfile
-from typing import Dict, List
-
-# ============ 第三方库导入 ============
-from rich.console import Console
+import re
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Union
 
 # ============ 本地模块导入 ============
+from src.core.config import CONFIG_DIR  # 配置目录
 from src.core.logger import logger  # 日志记录
 
-# 创建 Rich 控制台对象
-console = Console()
+# 并行 SSH 操作的最大线程数（I/O 密集，线程即可）
+SSH_MAX_WORKERS = 32
+
+# SSH 连接复用（ControlMaster）：同一节点的后续 ssh/scp 复用已建立的主连接，
+# 省去重复的 TCP + SSH 握手。%C 为 (本地主机, 远程主机, 端口, 用户) 的哈希，
+# 路径较短，不会超过 UNIX 套接字路径长度限制。
+# 套接字放在当前用户配置目录下的私有目录（0700）中，不与其他用户共用或冲突。
+# 目录在第一次构建 SSH 命令时才创建（见 _ensure_control_dir）。
+# 主连接不在退出时关闭：%C 套接字由所有 pulao 进程共用，空闲 ControlPersist 后自动退出
+SSH_CONTROL_DIR = CONFIG_DIR / "ssh"
+SSH_CONTROL_PATH = str(SSH_CONTROL_DIR / "%C")
+SSH_CONTROL_PERSIST = "60s"
+
+# 通用 SSH 选项（ssh 与 scp 共用）
+_SSH_BASE_OPTS = (
+    "-o", "StrictHostKeyChecking=no",
+    "-o", "BatchMode=yes",
+    "-o", "ConnectTimeout=3",
+    "-o", "ControlMaster=auto",
+    "-o", f"ControlPath={SSH_CONTROL_PATH}",
+    "-o", f"ControlPersist={SSH_CONTROL_PERSIST}",
+)
+
+# 完整的命令前缀，模块加载时构建一次
+_SSH_CMD_PREFIX = ("ssh",) + _SSH_BASE_OPTS
+_SCP_CMD_PREFIX = ("scp",) + _SSH_BASE_OPTS
+
+# 远程部署超时（秒）：写文件 + docker compose up
+DEPLOY_TIMEOUT = 360
+
+# 连接检查结果缓存：{(host, user, key_path): (检查时间, True 或 SSHError)}
+# 短时间内重复检查同一节点时直接返回上次结果，省去一次 SSH 握手
+_CONN_CACHE: Dict[tuple, tuple] = {}
+CONN_CACHE_TTL = 5.0
+
+# 控制套接字目录是否已准备好
+_CONTROL_DIR_READY = False
+
+
+def _ensure_control_dir() -> None:
+    """
+    创建 SSH 控制套接字目录（0700），每个进程只执行一次
+    
+    目录不可用时 ssh 无法创建主连接套接字，会退回为普通连接，这里只记录警告。
+    """
+    global _CONTROL_DIR_READY
+    if _CONTROL_DIR_READY:
+        return
+    try:
+        SSH_CONTROL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        SSH_CONTROL_DIR.chmod(0o700)
+    except OSError as e:
+        logger.warning(f"Cannot prepare SSH control directory {SSH_CONTROL_DIR}: {e}")
+    _CONTROL_DIR_READY = True
 
 
 # ============ SSH 异常类定义 ============
@@ -51,6 +105,25 @@ class SSHCommandError(SSHError):
     pass
 
 
+# ============ SSH 错误分类 ============
+
+# 连接检查失败时的错误分类：一次正则扫描 stderr，按命中的分组确定异常类型
+_SSH_ERROR_RE = re.compile(
+    r"(?P<auth>Permission denied|Authentication failed)"
+    r"|(?P<timeout>timed out|ConnectTimeout)"
+    r"|(?P<resolve>Could not resolve hostname)"
+    r"|(?P<refused>Connection refused)"
+)
+
+# 分组名 -> (异常类, 错误消息前缀)
+_SSH_ERROR_TYPES = {
+    "auth": (SSHAuthError, "Authentication failed"),
+    "timeout": (SSHConnectionError, "Connection timed out"),
+    "resolve": (SSHConnectionError, "Could not resolve hostname"),
+    "refused": (SSHConnectionError, "Connection refused"),
+}
+
+
 # ============ SSH 远程执行器类 ============
 
 class RemoteExecutor:
@@ -69,6 +142,23 @@ class RemoteExecutor:
     
     # ============ SSH 命令构建方法 ============
     
+    @staticmethod
+    def _key_opts(node: Dict) -> tuple:
+        """
+        返回节点的密钥选项，并确保控制套接字目录存在
+        
+        参数:
+            node: 节点配置字典
+        
+        返回:
+            ("-i", key_path) 或空元组
+        """
+        _ensure_control_dir()
+        key_path = node.get("key_path")
+        
+        # 如果指定了 SSH 密钥，添加到命令
+        return ("-i", key_path) if key_path else ()
+
     @staticmethod
     def _build_ssh_cmd(node: Dict, cmd: str) -> List[str]:
         """
@@ -85,19 +175,9 @@ class RemoteExecutor:
             - StrictHostKeyChecking=no: 自动信任主机密钥
             - BatchMode=yes: 禁止交互式密码提示
             - ConnectTimeout=3: 连接超时 3 秒
+            - ControlMaster/ControlPath/ControlPersist: 复用同一节点的 SSH 连接
         """
-        ssh_cmd = ["ssh", "-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes", "-o", "ConnectTimeout=3"]
-        
-        # 如果指定了 SSH 密钥，添加到命令
-        if node.get("key_path"):
-            ssh_cmd.extend(["-i", node["key_path"]])
-            
-        # 构建目标主机字符串
-        target = f"{node['user']}@{node['host']}"
-        ssh_cmd.append(target)
-        ssh_cmd.append(cmd)
-        
-        return ssh_cmd
+        return [*_SSH_CMD_PREFIX, *RemoteExecutor._key_opts(node), f"{node['user']}@{node['host']}", cmd]
 
     @staticmethod
     def _build_scp_cmd(node: Dict, local_path: str, remote_path: str) -> List[str]:
@@ -112,17 +192,10 @@ class RemoteExecutor:
         返回:
             SCP 命令列表
         """
-        scp_cmd = ["scp", "-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes", "-o", "ConnectTimeout=3"]
-        
-        # SSH 密钥
-        if node.get("key_path"):
-            scp_cmd.extend(["-i", node["key_path"]])
-            
-        # 目标路径
-        target = f"{node['user']}@{node['host']}:{remote_path}"
-        scp_cmd.extend([local_path, target])
-        
-        return scp_cmd
+        return [
+            *_SCP_CMD_PREFIX, *RemoteExecutor._key_opts(node),
+            local_path, f"{node['user']}@{node['host']}:{remote_path}",
+        ]
     
     # ============ SSH 连接检查方法 ============
     
@@ -131,7 +204,8 @@ class RemoteExecutor:
         """
         检查 SSH 连接到节点是否正常
         
-        发送一个简单的 "exit" 命令测试连接。
+        发送一个简单的 "exit" 命令测试连接。结果（成功或异常）缓存
+        CONN_CACHE_TTL 秒，期间重复检查同一节点不再发起 SSH 连接。
         
         参数:
             node: 节点配置字典，必须包含 host 和 user
@@ -139,6 +213,59 @@ class RemoteExecutor:
         返回:
             True 表示连接成功
         
+        异常:
+            SSHConnectionError: 连接失败
+            SSHAuthError: 认证失败
+        """
+        key = RemoteExecutor._conn_key(node)
+        cached = _CONN_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[0] < CONN_CACHE_TTL:
+            if isinstance(cached[1], Exception):
+                raise cached[1]
+            return cached[1]
+        
+        try:
+            result = RemoteExecutor._probe_connection(node)
+        except SSHError as e:
+            _CONN_CACHE[key] = (time.monotonic(), e)
+            raise
+        _CONN_CACHE[key] = (time.monotonic(), result)
+        return result
+
+    @staticmethod
+    def _conn_key(node: Dict) -> tuple:
+        """
+        连接检查缓存键
+        
+        参数:
+            node: 节点配置字典
+        
+        返回:
+            (host, user, key_path) 元组
+        """
+        return (node["host"], node["user"], node.get("key_path"))
+
+    @staticmethod
+    def invalidate_connection(node: Dict) -> None:
+        """
+        清除节点的连接检查缓存（远程操作失败时调用，避免返回过期的“在线”状态）
+        
+        参数:
+            node: 节点配置字典
+        """
+        _CONN_CACHE.pop(RemoteExecutor._conn_key(node), None)
+
+    @staticmethod
+    def _probe_connection(node: Dict) -> bool:
+        """
+        实际执行 SSH 连接检查（不使用缓存）
+        
+        参数:
+            node: 节点配置字典
+        
+        返回:
+            True 表示连接成功
+        
         异常:
             SSHConnectionError: 连接失败
             SSHAuthError: 认证失败
@@ -147,27 +274,24 @@ class RemoteExecutor:
         logger.debug(f"Checking connectivity to {node['name']}: {' '.join(cmd_list)}")
         
         try:
-            # 执行命令，10 秒超时
-            result = subprocess.run(cmd_list, capture_output=True, text=True, timeout=10)
+            # 执行命令，10 秒超时；只关心返回码，stdout 直接丢弃，stderr 仅在失败时解码
+            result = subprocess.run(
+                cmd_list, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=10
+            )
             
             if result.returncode == 0:
                 logger.info(f"Node {node['name']} is online")
                 return True
             else:
                 # 解析错误信息，抛出对应异常
-                error_msg = result.stderr.strip()
+                error_msg = result.stderr.decode("utf-8", "replace").strip()
                 logger.warning(f"Node {node['name']} connection failed: {error_msg}")
                 
-                if "Permission denied" in error_msg or "Authentication failed" in error_msg:
-                    raise SSHAuthError(f"Authentication failed for {node['name']}")
-                elif "timed out" in error_msg or "ConnectTimeout" in error_msg:
-                    raise SSHConnectionError(f"Connection timed out for {node['name']}")
-                elif "Could not resolve hostname" in error_msg:
-                    raise SSHConnectionError(f"Could not resolve hostname for {node['name']}")
-                elif "Connection refused" in error_msg:
-                    raise SSHConnectionError(f"Connection refused for {node['name']}")
-                else:
-                    raise SSHConnectionError(f"Connection failed for {node['name']}: {error_msg}")
+                match = _SSH_ERROR_RE.search(error_msg)
+                if match:
+                    exc_type, reason = _SSH_ERROR_TYPES[match.lastgroup]
+                    raise exc_type(f"{reason} for {node['name']}")
+                raise SSHConnectionError(f"Connection failed for {node['name']}: {error_msg}")
                     
         except subprocess.TimeoutExpired:
             logger.error(f"Node {node['name']} connection check timed out")
@@ -178,16 +302,61 @@ class RemoteExecutor:
             logger.error(f"Error connecting to {node['name']}: {e}")
             raise SSHConnectionError(f"Unexpected error for {node['name']}: {e}")
 
+    @staticmethod
+    def _run_parallel(func: Callable, nodes: List[Dict], *args, max_workers: int = SSH_MAX_WORKERS) -> Dict[str, Union[object, Exception]]:
+        """
+        在多个节点上并行执行同一个 SSH 操作
+        
+        参数:
+            func: 以节点为第一个参数的操作函数
+            nodes: 节点配置字典列表
+            *args: 传给 func 的其余参数
+            max_workers: 最大线程数
+        
+        返回:
+            节点名称到结果的映射，失败的节点对应捕获到的异常对象
+        """
+        if not nodes:
+            return {}
+        
+        def _call(node):
+            try:
+                return func(node, *args)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=min(len(nodes), max_workers)) as executor:
+            results = list(executor.map(_call, nodes))
+        return {node["name"]: result for node, result in zip(nodes, results)}
+
+    @staticmethod
+    def check_connections(nodes: List[Dict], max_workers: int = SSH_MAX_WORKERS) -> Dict[str, Union[bool, Exception]]:
+        """
+        并行检查多个节点的 SSH 连接
+        
+        总耗时取决于最慢的节点，而不是所有节点耗时之和。
+        
+        参数:
+            nodes: 节点配置字典列表
+            max_workers: 最大线程数
+        
+        返回:
+            节点名称到检查结果的映射：成功为 True，失败为对应的 SSHError
+        """
+        return RemoteExecutor._run_parallel(RemoteExecutor.check_connection, nodes, max_workers=max_workers)
+
     # ============ 远程命令执行方法 ============
     
     @staticmethod
-    def execute(node: Dict, command: str) -> str:
+    def execute(node: Dict, command: str, input: Optional[str] = None, timeout: int = 300) -> str:
         """
         在远程节点上执行命令
         
         参数:
             node: 节点配置字典
             command: 要执行的命令
+            input: 通过标准输入传给远程命令的内容，可为空
+            timeout: 超时时间（秒），默认 5 分钟
         
         返回:
             命令的标准输出
@@ -199,8 +368,9 @@ class RemoteExecutor:
         logger.debug(f"Executing on {node['name']}: {command}")
         
         try:
-            # 5 分钟超时
-            result = subprocess.run(cmd_list, capture_output=True, text=True, timeout=300)
+            # 没有输入时关闭标准输入，避免 ssh 继承终端而意外挂起
+            stdin_kwargs = {"input": input} if input is not None else {"stdin": subprocess.DEVNULL}
+            result = subprocess.run(cmd_list, capture_output=True, text=True, timeout=timeout, **stdin_kwargs)
             
             if result.returncode == 0:
                 logger.info(f"Command success on {node['name']}")
@@ -211,9 +381,11 @@ class RemoteExecutor:
                 logger.error(f"Command failed on {node['name']}: {error_msg}")
                 raise SSHCommandError(f"Command failed on {node['name']}: {error_msg}")
         except subprocess.TimeoutExpired:
+            RemoteExecutor.invalidate_connection(node)
             logger.error(f"Command timed out on {node['name']}")
             raise SSHCommandError(f"Command timed out on {node['name']}")
         except Exception as e:
+            RemoteExecutor.invalidate_connection(node)
             if isinstance(e, SSHError):
                 raise
             logger.error(f"Error executing on {node['name']}: {e}")
@@ -238,18 +410,22 @@ class RemoteExecutor:
         logger.debug(f"Copying to {node['name']}: {local_path} -> {remote_path}")
         
         try:
-            result = subprocess.run(cmd_list, capture_output=True, text=True, timeout=60)
+            result = subprocess.run(
+                cmd_list, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=60
+            )
             if result.returncode == 0:
                 logger.info(f"Copy success to {node['name']}")
                 return
             else:
-                error_msg = result.stderr.strip()
+                error_msg = result.stderr.decode("utf-8", "replace").strip()
                 logger.error(f"Copy failed to {node['name']}: {error_msg}")
                 raise SSHCommandError(f"SCP failed to {node['name']}: {error_msg}")
         except subprocess.TimeoutExpired:
+            RemoteExecutor.invalidate_connection(node)
             logger.error(f"SCP timed out to {node['name']}")
             raise SSHConnectionError(f"SCP timed out to {node['name']}")
         except Exception as e:
+            RemoteExecutor.invalidate_connection(node)
             if isinstance(e, SSHError):
                 raise
             logger.error(f"Error copying to {node['name']}: {e}")
@@ -257,16 +433,35 @@ class RemoteExecutor:
 
     # ============ 远程 Docker 部署方法 ============
     
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _compose_script(project_name: str) -> str:
+        """
+        构建远程部署脚本：创建目录、从标准输入写入 docker-compose.yml 并启动服务
+        
+        结果按项目名称缓存，多节点部署时只构建一次，各节点复用同一脚本。
+        
+        参数:
+            project_name: 项目名称
+        
+        返回:
+            远程 shell 脚本
+        """
+        # ~ 保持在引号外以便远程 shell 展开，项目名称需要转义
+        remote_dir = f"~/.pulao/deployments/{shlex.quote(project_name)}"
+        remote_file = f"{remote_dir}/docker-compose.yml"
+        return (
+            f"set -e; mkdir -p {remote_dir} && cat > {remote_file} "
+            f"&& cd {remote_dir} && docker compose up -d --remove-orphans"
+        )
+    
     @staticmethod
     def deploy_compose(node: Dict, yaml_content: str, project_name: str) -> None:
         """
         在远程节点上部署 Docker Compose 服务
         
-        执行流程：
-            1. 创建远程目录
-            2. 将 YAML 内容写入临时文件
-            3. SCP 上传到远程节点
-            4. 执行 docker compose up -d
+        整个部署只需一次 SSH 调用：YAML 通过标准输入传入，远程脚本依次
+        创建目录、写入 docker-compose.yml 并执行 docker compose up -d。
         
         参数:
             node: 节点配置字典
@@ -278,27 +473,29 @@ class RemoteExecutor:
         """
         logger.info(f"Deploying project '{project_name}' to {node['name']}")
         
-        # 1. 创建远程目录
-        remote_dir = f"~/.pulao/deployments/{project_name}"
-        RemoteExecutor.execute(node, f"mkdir -p {remote_dir}")
-
-        # 2. 写入本地临时文件
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=".yml") as tmp:
-            tmp.write(yaml_content)
-            tmp_path = tmp.name
+        # 写文件（60 秒）+ 启动服务（5 分钟）
+        script = RemoteExecutor._compose_script(project_name)
+        RemoteExecutor.execute(node, script, input=yaml_content, timeout=DEPLOY_TIMEOUT)
+        
+        logger.info(f"Deployment successful on {node['name']}")
 
-        try:
-            # 3. SCP 上传文件
-            remote_file = f"{remote_dir}/docker-compose.yml"
-            RemoteExecutor.copy_file(node, tmp_path, remote_file)
-            
-            # 4. 执行 docker compose up
-            up_cmd = f"cd {remote_dir} && docker compose up -d --remove-orphans"
-            RemoteExecutor.execute(node, up_cmd)
-            
-            logger.info(f"Deployment successful on {node['name']}")
-            
-        finally:
-            # 清理本地临时文件
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+    @staticmethod
+    def deploy_compose_many(deployments: List[tuple], project_name: str, max_workers: int = SSH_MAX_WORKERS) -> Dict[str, Union[None, Exception]]:
+        """
+        并行在多个节点上部署 Docker Compose 服务
+        
+        参数:
+            deployments: (节点配置字典, YAML 内容) 元组列表
+            project_name: 项目名称
+            max_workers: 最大线程数
+        
+        返回:
+            节点名称到结果的映射：成功为 None，失败为捕获到的异常对象
+        """
+        yaml_by_name = {node["name"]: yaml_content for node, yaml_content in deployments}
+        nodes = [node for node, _ in deployments]
+        
+        def _deploy(node):
+            RemoteExecutor.deploy_compose(node, yaml_by_name[node["name"]], project_name)
+        
+        return RemoteExecutor._run_parallel(_deploy, nodes, max_workers=max_workers)
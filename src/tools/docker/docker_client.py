@@ -0,0 +1,73 @@
+"""
+Docker Engine API 客户端模块
+
+本模块提供进程内共享的 Docker Engine API 客户端，通过 Unix 套接字
+（或 DOCKER_HOST 指定的地址）直接访问 Docker 守护进程。
+
+与每次 fork/exec 一个 docker 命令相比，一次 HTTP 请求只需毫秒级，
+且客户端内部的连接池会保持连接，多次查询复用同一连接。
+
+主要函数：
+    - get_docker_api(): 获取共享的低级 API 客户端（每个超时时间一个）
+    - reset_docker_api(): 丢弃当前客户端（守护进程重启等情况）
+
+依赖：
+    - docker: Docker SDK（按需导入，未安装时调用方应回退到 docker 命令）
+"""
+
+# ============ 标准库导入 ============
+import threading
+from typing import Dict
+
+# ============ 本地模块导入 ============
+from src.core.logger import logger  # 日志记录
+
+# API 请求超时时间（秒）
+DOCKER_API_TIMEOUT = 5
+
+# 共享客户端（按请求超时时间区分）及其创建锁
+_APIS: Dict[int, object] = {}
+_API_LOCK = threading.Lock()
+
+
+def get_docker_api(timeout: int = DOCKER_API_TIMEOUT):
+    """
+    获取共享的 Docker Engine API 低级客户端（首次调用时创建）
+
+    超时时间在客户端创建后无法修改，因此每个超时时间各缓存一个客户端，
+    不同调用方传入的超时都会生效。docker SDK 在首次调用时才导入。创建失败（未安装 SDK、守护进程未运行）
+    时抛出异常，且不缓存失败结果，下次调用会重试。
+
+    参数:
+        timeout: 请求超时时间（秒）
+
+    返回:
+        docker.APIClient 实例
+
+    异常:
+        ImportError: 未安装 docker SDK
+        docker.errors.DockerException: 无法连接守护进程
+    """
+    api = _APIS.get(timeout)
+    if api is None:
+        with _API_LOCK:
+            api = _APIS.get(timeout)
+            if api is None:
+                import docker
+                api = docker.from_env(timeout=timeout).api
+                _APIS[timeout] = api
+                logger.debug(f"Docker Engine API client created (timeout={timeout}s)")
+    return api
+
+
+def reset_docker_api():
+    """
+    丢弃所有共享客户端，下次 get_docker_api 时重新创建
+    """
+    with _API_LOCK:
+        for api in _APIS.values():
+            try:
+                api.close()
+            except Exception:
+                pass
+        _APIS.clear()
@@ -155,8 +155,8 @@ def deploy_cluster(plan_content: Dict[str, str], project_name: str = "default")
     
     执行流程：
         1. 加载当前集群节点列表
-        2. 对所有目标节点进行预检查（SSH 连接测试）
-        3. 遍历每个节点的配置，通过 SSH 远程部署
+        2. 对所有目标节点并行进行预检查（SSH 连接测试）
+        3. 并行将每个节点的配置通过 SSH 远程部署
         4. 返回部署统计（成功数、失败数、错误列表）
     
     参数:
@@ -176,18 +176,20 @@ def deploy_cluster(plan_content: Dict[str, str], project_name: str = "default")
     nodes = ClusterManager.get_current_nodes()
     nodes_map = {n["name"]: n for n in nodes}
     
-    # 步骤1: 预检查 - 验证所有目标节点的 SSH 连接
-    failed_nodes = []
+    # 步骤1: 预检查 - 并行验证所有目标节点的 SSH 连接
+    targets = []
     for node_name in plan_content.keys():
         if node_name not in nodes_map:
             logger.warning(f"Node '{node_name}' not found in cluster")
             continue
-        
-        node = nodes_map[node_name]
-        try:
-            RemoteExecutor.check_connection(node)
-        except SSHError as e:
-            logger.warning(f"Pre-flight check failed for {node_name}: {e}")
+        targets.append(nodes_map[node_name])
+    
+    failed_nodes = []
+    checks = RemoteExecutor.check_connections(targets)
+    for node in targets:
+        result = checks[node["name"]]
+        if isinstance(result, Exception):
+            logger.warning(f"Pre-flight check failed for {node['name']}: {result}")
             failed_nodes.append(node)
     
     # 如果有节点连接失败，中止部署
@@ -196,29 +198,31 @@ def deploy_cluster(plan_content: Dict[str, str], project_name: str = "default")
         logger.error(f"Cluster deployment aborted: {len(failed_nodes)} nodes failed pre-flight check")
         raise DeploymentError(error_msg, failed_nodes)
 
-    # 步骤2: 遍历部署
+    # 步骤2: 并行部署
     success_count = 0
     fail_count = 0
     errors = []
     
+    deployments = []
     for node_name, yaml_content in plan_content.items():
         if node_name not in nodes_map:
             fail_count += 1
             continue
-            
-        node = nodes_map[node_name]
-        try:
-            # 调用远程部署函数
-            RemoteExecutor.deploy_compose(node, yaml_content, project_name)
+        deployments.append((nodes_map[node_name], yaml_content))
+    
+    results = RemoteExecutor.deploy_compose_many(deployments, project_name)
+    for node, _ in deployments:
+        node_name = node["name"]
+        result = results[node_name]
+        if result is None:
             success_count += 1
-        except SSHError as e:
-            logger.error(f"Deployment failed for {node_name}: {e}")
-            errors.append(f"Node '{node_name}': {e}")
-            fail_count += 1
-        except Exception as e:
-            logger.error(f"Unexpected error for {node_name}: {e}")
-            errors.append(f"Node '{node_name}': {e}")
-            fail_count += 1
+            continue
+        if isinstance(result, SSHError):
+            logger.error(f"Deployment failed for {node_name}: {result}")
+        else:
+            logger.error(f"Unexpected error for {node_name}: {result}")
+        errors.append(f"Node '{node_name}': {result}")
+        fail_count += 1
             
     logger.info(f"Cluster deployment finished: {success_count} success, {fail_count} failed")
     
@@ -24,6 +24,9 @@ AI 工具注册与调用模块
 # ============ 标准库导入 ============
 import json
 import inspect
+import re
+import types
+import typing
 from typing import Callable, Dict, List, Any, Optional
 from functools import wraps
 
@@ -35,6 +38,116 @@ from src.tools.system.system_ops import execute_shell_command, check_port_availa
 from src.core.logger import logger  # 日志记录
 
 
+# ============ 类型映射 ============
+
+# Python 类型 -> JSON Schema 类型
+_TYPE_MAP = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+}
+
+
+def _json_type(annotation: Any) -> Dict[str, Any]:
+    """
+    将参数类型标注转换为 JSON Schema 类型描述
+    
+    支持 Optional[X] / X | None（取 X）以及 list[T] / List[T]（生成 items）。
+    
+    参数:
+        annotation: 参数类型标注
+    
+    返回:
+        形如 {"type": "array", "items": {"type": "integer"}} 的字典
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    
+    # Optional[X]：去掉 None 后只剩一个类型时按该类型处理
+    if origin in (typing.Union, types.UnionType):
+        non_none = [a for a in args if a is not type(None)]
+        if len(non_none) == 1:
+            return _json_type(non_none[0])
+        return {"type": "string"}
+    
+    schema = {"type": _TYPE_MAP.get(origin or annotation, "string")}
+    if schema["type"] == "array" and args:
+        schema["items"] = _json_type(args[0])
+    return schema
+
+
+# ============ 文档字符串解析 ============
+
+# 参数段落标题（Google 风格 / 本项目的中文风格）
+_PARAM_SECTION_RE = re.compile(r"^(\s*)(?:参数|Args|Arguments|Parameters)\s*[:：]\s*$")
+# 参数段落中的一行："name: 描述" 或 "name (类型): 描述"
+_PARAM_LINE_RE = re.compile(r"^(\s+)(\w+)\s*(?:\([^)]*\))?\s*[:：]\s*(.*)$")
+# reST 风格：":param name: 描述" 或 ":param 类型 name: 描述"
+_REST_PARAM_RE = re.compile(r"^\s*:param\s+(?:[^:]+\s+)?(\w+)\s*:\s*(.*)$")
+
+
+def _parse_param_docs(doc: str) -> Dict[str, str]:
+    """
+    从文档字符串中提取各参数的描述
+    
+    支持 "参数:" / "Args:" 段落和 reST 的 ":param name:" 写法；
+    参数描述的续行（缩进更深的行）会拼接到同一描述中。
+    
+    参数:
+        doc: 函数的文档字符串
+    
+    返回:
+        参数名到描述的映射
+    """
+    result: Dict[str, str] = {}
+    section_indent = None  # 当前所在参数段落标题的缩进；None 表示不在段落中
+    item_indent = None
+    current = None
+    
+    for line in inspect.cleandoc(doc).splitlines():
+        rest = _REST_PARAM_RE.match(line)
+        if rest:
+            current = rest.group(1)
+            result[current] = rest.group(2).strip()
+            continue
+        
+        header = _PARAM_SECTION_RE.match(line)
+        if header:
+            section_indent, item_indent, current = len(header.group(1)), None, None
+            continue
+        
+        if not line.strip():
+            continue
+        
+        if section_indent is None:
+            # reST 参数描述的续行
+            if current is not None and line[:1].isspace():
+                result[current] = f"{result[current]} {line.strip()}".strip()
+            else:
+                current = None
+            continue
+        
+        indent = len(line) - len(line.lstrip())
+        if indent <= section_indent:
+            # 缩进回到标题层级：参数段落结束
+            section_indent, current = None, None
+            continue
+        
+        item = _PARAM_LINE_RE.match(line)
+        if item and (item_indent is None or len(item.group(1)) == item_indent):
+            item_indent = len(item.group(1))
+            current = item.group(2)
+            result[current] = item.group(3).strip()
+        elif current is not None:
+            # 续行
+            result[current] = f"{result[current]} {line.strip()}".strip()
+    
+    return result
+
+
 # ============ 工具注册表类 ============
 
 class ToolRegistry:
@@ -71,16 +184,19 @@ class ToolRegistry:
             装饰器包装器函数
         
         执行流程：
-            1. 生成函数工具模式
+            1. 生成函数工具模式（按函数对象缓存，同一函数只生成一次）
             2. 将函数添加到注册表
-            3. 将模式添加到列表
+            3. 将模式添加到列表（同名工具重复注册时替换旧模式）
             4. 返回包装器
         """
         # 生成工具模式
         schema = self._generate_schema(func)
         
         # 注册函数
-        self._tools[func.__name__] = func
+        name = func.__name__
+        if name in self._tools:
+            self._schemas = [item for item in self._schemas if item["function"]["name"] != name]
+        self._tools[name] = func
         self._schemas.append(schema)
         
         # 装饰器包装器
@@ -117,20 +233,31 @@ class ToolRegistry:
         
         模式生成规则：
         1. 提取文档字符串第一行作为函数描述
-        2. 遍历函数参数，提取参数名、类型、默认值
+        2. 遍历函数参数，提取参数名、类型、默认值；参数描述取自文档字符串的
+           "参数:" / "Args:" 段落，缺失时使用占位描述
         3. 必填参数（无默认值）添加到 required 列表
-        4. 参数类型映射：int->integer, bool->boolean, dict->object, list->array
+        4. 参数类型映射（_TYPE_MAP）：int->integer, float->number, bool->boolean, dict->object, list->array；
+           Optional[X] 按 X 处理，list[T] 生成 items
         
         参数:
             func: Python 函数对象
         
         返回:
             OpenAI 函数调用格式的模式字典
+        
+        生成结果保存在函数对象的 _pulao_schema 属性上，同一函数再次注册时直接复用。
         """
+        cached = getattr(func, "_pulao_schema", None)
+        if cached is not None:
+            return cached
+        
         # 提取文档字符串第一行作为描述
         doc = func.__doc__ or ""
         description = doc.strip().split("\n")[0]
         
+        # 从文档字符串的参数段落提取参数描述
+        param_docs = _parse_param_docs(doc) if doc else {}
+        
         # 获取函数签名
         sig = inspect.signature(func)
         
@@ -146,29 +273,18 @@ class ToolRegistry:
             if name == "self": 
                 continue
             
-            # 类型推断
-            param_type = "string"  # 默认类型
-            if param.annotation == int:
-                param_type = "integer"
-            elif param.annotation == bool:
-                param_type = "boolean"
-            elif param.annotation == dict:
-                param_type = "object"
-            elif param.annotation == list:
-                param_type = "array"
-            
-            # 添加参数属性
+            # 类型推断（未标注或无法识别的类型按字符串处理）
             parameters["properties"][name] = {
-                "type": param_type,
-                "description": f"Parameter {name}"
+                **_json_type(param.annotation),
+                "description": param_docs.get(name) or f"Parameter {name}"
             }
             
             # 如果没有默认值，标记为必填
             if param.default == inspect.Parameter.empty:
                 parameters["required"].append(name)
                 
-        # 返回完整的工具模式
-        return {
+        # 完整的工具模式
+        schema = {
             "type": "function",
             "function": {
                 "name": func.__name__,
@@ -176,6 +292,12 @@ class ToolRegistry:
                 "parameters": parameters
             }
         }
+        
+        try:
+            func._pulao_schema = schema
+        except (AttributeError, TypeError):
+            pass  # 内置函数等不支持设置属性，不缓存
+        return schema
 
 
 # ============ 全局工具注册表实例 ============
@@ -1219,7 +1341,8 @@ def execute_command(command: str) -> str:
     try:
         logger.info(f"Executing shell command: {command}")
         import subprocess
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=30)
+        # stdin 为 /dev/null：读取标准输入的命令不会抢走 REPL 输入或批处理脚本的后续行
+        result = subprocess.run(command, shell=True, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=30)
         if result.returncode == 0:
             return f"Stdout: {result.stdout}"
         else:
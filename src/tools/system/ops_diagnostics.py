@@ -38,6 +38,7 @@ from src.core.logger import logger
 from src.core.config import CONFIG_DIR
 from src.tools.cluster.cluster import ClusterManager
 from src.tools.cluster.remote_ops import RemoteExecutor
+from src.tools.docker.docker_client import get_docker_api
 from src.tools.registry import registry
 
 console = Console()
@@ -164,6 +165,35 @@ def analyze_logs(logs: str, keywords: Optional[List[str]] = None) -> Dict:
 
 # ============ 容器状态检查工具 ============
 
+def _inspect_state_local(container_name: str) -> Optional[str]:
+    """
+    通过 Docker Engine API 查询本机容器状态
+    
+    输出格式与 docker inspect --format "状态|运行中|健康|退出码" 一致。
+    
+    参数:
+        container_name: 容器名称或ID
+    
+    返回:
+        状态字符串；Engine API 不可用时返回 None（调用方回退到 docker 命令）
+    """
+    try:
+        api = get_docker_api()
+    except Exception:
+        return None
+    
+    try:
+        state = api.inspect_container(container_name).get("State", {})
+    except Exception as e:
+        if getattr(getattr(e, "response", None), "status_code", None) == 404:
+            return f"Error: No such object: {container_name}"
+        return None
+    
+    health = (state.get("Health") or {}).get("Status", "none")  # 未配置健康检查
+    running = "true" if state.get("Running") else "false"
+    return f"{state.get('Status', '')}|{running}|{health}|{state.get('ExitCode', 0)}"
+
+
 def check_container_status(container_name: str, host: Optional[str] = None) -> DiagnosticResult:
     """
     检查容器状态
@@ -183,8 +213,10 @@ def check_container_status(container_name: str, host: Optional[str] = None) -> D
         if host:
             output = RemoteExecutor.execute_command(host, " ".join(cmd))
         else:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            output = result.stdout if result.returncode == 0 else result.stderr
+            output = _inspect_state_local(container_name)
+            if output is None:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+                output = result.stdout if result.returncode == 0 else result.stderr
         
         if "No such object" in output or "Error" in output:
             return DiagnosticResult(
@@ -13,16 +13,30 @@
 """
 
 # ============ 标准库导入 ============
+import codecs
+import os
+import selectors
+import shutil
 import subprocess
 import platform
 import socket
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 # ============ 第三方库导入 ============
 from rich.console import Console
+from rich.text import Text
+
+# psutil 为可选依赖（未列入 requirements.txt）：可用时直接读取监听端口，省去 lsof | grep | head 管道
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 # ============ 本地模块导入 ============
 from src.core.i18n import t  # 国际化翻译函数
+from src.tools.docker.docker_client import get_docker_api  # 共享的 Docker Engine API 客户端
 
 # 创建 Rich 控制台对象
 console = Console()
@@ -30,6 +44,153 @@ console = Console()
 
 # ============ 系统信息收集函数 ============
 
+# 单个探测命令的超时时间（秒），避免某个卡住的守护进程拖慢整体
+PROBE_TIMEOUT = 2
+
+# 探测线程池（首次使用时创建，进程内复用）
+_PROBE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _get_probe_executor() -> ThreadPoolExecutor:
+    """
+    获取共享的探测线程池
+    """
+    global _PROBE_EXECUTOR
+    if _PROBE_EXECUTOR is None:
+        _PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=5, thread_name_prefix="sysinfo")
+    return _PROBE_EXECUTOR
+
+
+@lru_cache(maxsize=1)
+def _probe_os() -> Optional[str]:
+    """探测操作系统信息（名称、版本、架构），进程内不会变化，只探测一次"""
+    try:
+        return f"OS: {platform.system()} {platform.release()} ({platform.machine()})"
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _probe_ip() -> Optional[str]:
+    """探测内网 IP 地址（gethostbyname 可能阻塞在 DNS 上），只探测一次"""
+    try:
+        hostname = socket.gethostname()
+        return f"Internal IP: {socket.gethostbyname(hostname)}"
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _has(tool: str) -> bool:
+    """
+    检查命令行工具是否存在于 PATH 中（按工具名缓存）
+    
+    缺失的工具直接跳过对应探测，不再每次 fork/exec 后才因 ENOENT 失败。
+    """
+    return shutil.which(tool) is not None
+
+
+def _format_container_ports(ports: List[Dict]) -> str:
+    """
+    按 docker ps 的格式显示容器端口（如 0.0.0.0:8080->80/tcp）
+    """
+    parts = []
+    for p in ports:
+        if p.get("PublicPort"):
+            parts.append(f"{p.get('IP', '')}:{p['PublicPort']}->{p['PrivatePort']}/{p.get('Type', 'tcp')}")
+        else:
+            parts.append(f"{p['PrivatePort']}/{p.get('Type', 'tcp')}")
+    return ", ".join(parts)
+
+
+def _probe_docker_version() -> Optional[str]:
+    """探测 Docker 版本，未安装时返回 None（优先走 Engine API，失败时回退到 docker CLI）"""
+    try:
+        version = get_docker_api(PROBE_TIMEOUT).version()
+        return f"Docker version {version['Version']}, build {version.get('GitCommit', '')[:7]}"
+    except Exception:
+        pass
+    if not _has("docker"):
+        return None
+    try:
+        return subprocess.check_output(
+            ["docker", "--version"], stdin=subprocess.DEVNULL, text=True, timeout=PROBE_TIMEOUT
+        ).strip()
+    except Exception:
+        return None
+
+
+def _probe_docker_ps() -> Optional[str]:
+    """探测运行中的容器列表（优先走 Engine API，失败时回退到 docker ps）"""
+    try:
+        containers = get_docker_api(PROBE_TIMEOUT).containers()
+    except Exception:
+        containers = None
+    
+    if containers is not None:
+        if not containers:
+            return ""
+        rows = [("NAMES", "IMAGE", "PORTS")] + [
+            ((c.get("Names") or [""])[0].lstrip("/"), c.get("Image", ""), _format_container_ports(c.get("Ports") or []))
+            for c in containers
+        ]
+        # 与 docker ps 的表格输出一样按列对齐
+        widths = [max(len(row[i]) for row in rows) for i in range(2)]
+        return "\n".join(
+            f"{name.ljust(widths[0])}   {image.ljust(widths[1])}   {ports}".rstrip()
+            for name, image, ports in rows
+        )
+    
+    if not _has("docker"):
+        return None
+    try:
+        return subprocess.check_output(
+            ["docker", "ps", "--format", "table {{.Names}}\t{{.Image}}\t{{.Ports}}"],
+            stdin=subprocess.DEVNULL, text=True, timeout=PROBE_TIMEOUT
+        ).strip()
+    except Exception:
+        return None
+
+
+def _probe_ports() -> Optional[str]:
+    """
+    探测监听端口（最多 10 行）
+    
+    优先使用 psutil 读取；psutil 不可用或无权限时回退到 lsof 命令：
+        -sTCP:LISTEN -iTCP: 只显示处于监听状态的 TCP 连接
+        -P: 不转换端口号
+        -n: 不解析主机名
+    """
+    if psutil is not None:
+        try:
+            lines = []
+            for conn in psutil.net_connections(kind="inet"):
+                if conn.status != psutil.CONN_LISTEN:
+                    continue
+                try:
+                    name = psutil.Process(conn.pid).name() if conn.pid else "-"
+                except Exception:
+                    name = "-"
+                lines.append(f"{name} {conn.pid or '-'} TCP {conn.laddr.ip}:{conn.laddr.port} (LISTEN)")
+                if len(lines) == 10:
+                    break
+            return "\n".join(lines)
+        except Exception:
+            pass
+    
+    if not _has("lsof"):
+        return None
+    try:
+        # 直接执行 lsof（不经过 shell 管道），只列出 TCP 监听套接字，在 Python 中截取前 10 行
+        result = subprocess.run(
+            ["lsof", "-sTCP:LISTEN", "-iTCP", "-P", "-n"],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+    except Exception:
+        return None
+    return "\n".join([line for line in result.stdout.splitlines() if "LISTEN" in line][:10])
+
+
 def get_system_info() -> str:
     """
     收集系统信息用于 AI 上下文
@@ -40,6 +201,9 @@ def get_system_info() -> str:
     3. Docker 版本和运行中的容器
     4. 监听的端口列表
     
+    各项探测相互独立，在线程池中并行执行，总耗时取决于最慢的一项；
+    结果按固定顺序拼接，输出保持稳定。
+    
     这些信息会被包含在 AI 的系统提示词中，帮助 AI 了解当前环境状态。
     
     返回:
@@ -49,67 +213,57 @@ def get_system_info() -> str:
         - 容器列表最多显示 10 行，避免信息过长
         - 端口列表最多显示 10 行
         - 各项信息如果获取失败会显示 "Not detected"
+        - 每个探测命令最多等待 PROBE_TIMEOUT 秒
     """
+    executor = _get_probe_executor()
+    futures = [
+        executor.submit(probe)
+        for probe in (_probe_os, _probe_ip, _probe_docker_version, _probe_docker_ps, _probe_ports)
+    ]
+    os_info, ip_info, docker_ver, containers, ports_output = (f.result() for f in futures)
+    
     info = []
     
     # ====== 1. 操作系统信息 ======
-    try:
-        info.append(f"OS: {platform.system()} {platform.release()} ({platform.machine()})")
-    except:
-        pass
+    if os_info:
+        info.append(os_info)
 
     # ====== 2. 内网 IP 地址 ======
-    try:
-        hostname = socket.gethostname()
-        ip_addr = socket.gethostbyname(hostname)
-        info.append(f"Internal IP: {ip_addr}")
-    except:
-        pass
+    if ip_info:
+        info.append(ip_info)
 
     # ====== 3. Docker 版本和容器 ======
-    try:
-        # 获取 Docker 版本
-        docker_ver = subprocess.check_output(["docker", "--version"], text=True).strip()
-        info.append(f"Docker: {docker_ver}")
-        
-        # 获取运行中的容器列表
-        try:
-            containers = subprocess.check_output(
-                ["docker", "ps", "--format", "table {{.Names}}\t{{.Image}}\t{{.Ports}}"], 
-                text=True
-            ).strip()
-            if containers:
-                info.append("\n[Running Docker Containers]")
-                # 限制显示前 10 行，避免过长
-                lines = containers.split('\n')
-                if len(lines) > 10:
-                    info.append("\n".join(lines[:10]))
-                    info.append(f"... ({len(lines)-10} more)")
-                else:
-                    info.append(containers)
-        except:
-            pass
-    except:
+    if docker_ver is None:
         info.append("Docker: Not detected")
+    else:
+        info.append(f"Docker: {docker_ver}")
+        if containers:
+            info.append("\n[Running Docker Containers]")
+            # 限制显示前 10 行，避免过长
+            lines = containers.split('\n')
+            if len(lines) > 10:
+                info.append("\n".join(lines[:10]))
+                info.append(f"... ({len(lines)-10} more)")
+            else:
+                info.append(containers)
         
     # ====== 4. 监听端口 ======
-    try:
-        # 使用 lsof 命令获取监听端口
-        # -i: 显示网络连接
-        # -P: 不转换端口号
-        # -n: 不解析主机名
-        ports_output = subprocess.check_output("lsof -i -P -n | grep LISTEN | head -n 10", shell=True, text=True).strip()
-        if ports_output:
-            info.append("\n[Listening Ports (Host)]")
-            info.append(ports_output)
-    except:
-        pass
+    if ports_output:
+        info.append("\n[Listening Ports (Host)]")
+        info.append(ports_output)
         
     return "\n".join(info)
 
 
 # ============ Shell 命令执行函数 ============
 
+# stdbuf（coreutils）路径，模块加载时检测一次；不存在时为 None
+_STDBUF = shutil.which("stdbuf")
+
+# 每次从管道读取的最大字节数：大块读取，输出量大时减少 read 系统调用次数
+_READ_CHUNK = 65536
+
+
 def execute_shell_command(command: str):
     """
     执行 Shell 命令并显示输出
@@ -123,54 +277,100 @@ def execute_shell_command(command: str):
     执行流程：
         1. 显示待执行的命令
         2. 使用 subprocess.Popen 异步执行
-        3. 实时流式读取 stdout 并显示
-        4. 执行完成后显示 stderr（如果有错误）
-        5. 显示成功/失败状态
+        3. 用 selectors 同时监听 stdout 和 stderr，哪个可读就读哪个，
+           按行实时显示（stderr 为红色），两者交错输出
+        4. 显示成功/失败状态
     
     注意:
-        - 使用 shell=True 允许管道和复杂命令
-        - 使用 executable="/bin/bash" 确保使用 bash
+        - 通过 bash -c 执行，允许管道和复杂命令
+        - 子进程设置 PYTHONUNBUFFERED=1；系统有 stdbuf 时以行缓冲方式运行整个命令，
+          输出逐行出现，而不是等缓冲区写满
+        - 同时读取两个管道，子进程大量写 stderr 时不会因管道写满而卡住
+        - 子进程 stdin 为 /dev/null，不会抢读终端或批处理脚本的后续输入
         - 危险操作（如删除）会在 ai.py 中由用户确认
     """
-    # 显示待执行的命令
-    console.print(f"[bold yellow]{t('executing_command')}:[/bold yellow] {command}")
+    # 显示待执行的命令（直接构建 Text，命令中的方括号不会被当作 markup 解析）
+    console.print(Text.assemble((f"{t('executing_command')}:", "bold yellow"), " ", command))
     
     try:
+        # 子进程写管道时默认块缓冲，输出要等缓冲区满或退出才出现：
+        # PYTHONUNBUFFERED 让 Python 子进程逐行输出；有 stdbuf 时用它包裹整个 bash，
+        # 其行缓冲设置（通过环境变量继承）对管道中的 grep/sed/awk 等命令同样生效
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        
         # 使用 Popen 异步执行，允许流式输出
-        # shell=True: 允许管道、重定向等复杂命令
-        # executable="/bin/bash": 指定使用 bash
-        process = subprocess.Popen(
-            command, 
-            shell=True,
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True,
-            executable="/bin/bash"
-        )
+        if _STDBUF:
+            process = subprocess.Popen(
+                [_STDBUF, "-oL", "-eL", "/bin/bash", "-c", command],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env
+            )
+        else:
+            # shell=True: 允许管道、重定向等复杂命令
+            # executable="/bin/bash": 指定使用 bash
+            process = subprocess.Popen(
+                command, 
+                shell=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE, 
+                stderr=subprocess.PIPE,
+                executable="/bin/bash",
+                env=env
+            )
         
-        # 实时流式读取输出
-        while True:
-            output = process.stdout.readline()
-            # 如果没有输出且进程已结束，退出循环
-            if output == '' and process.poll() is not None:
-                break
-            # 逐行输出
-            if output:
-                console.print(output.strip())
-                
-        # 获取剩余的 stderr 输出
-        stderr = process.stderr.read()
-        if stderr:
-            console.print(f"[red]{stderr}[/red]")
+        _stream_output(process)
             
         # 显示执行结果状态
         if process.returncode == 0:
-            console.print(f"[bold green]{t('command_success')}[/bold green]")
+            console.print(Text(t("command_success"), style="bold green"))
         else:
-            console.print(f"[bold red]{t('command_failed')}[/bold red]")
+            console.print(Text(t("command_failed"), style="bold red"))
             
     except Exception as e:
-        console.print(f"[bold red]{t('error_executing_command')}[/bold red] {e}")
+        console.print(Text.assemble((t("error_executing_command"), "bold red"), " ", str(e)))
+
+
+def _stream_output(process: subprocess.Popen):
+    """
+    同时读取子进程的 stdout 和 stderr 并按行实时显示，直到两个管道都关闭
+    
+    参数:
+        process: 以 stdout=PIPE、stderr=PIPE（二进制模式）启动的子进程
+    """
+    sel = selectors.DefaultSelector()
+    # 每个管道的状态：[显示样式, 增量解码器, 未完成的半行]
+    for stream, style in ((process.stdout, None), (process.stderr, "red")):
+        os.set_blocking(stream.fileno(), False)
+        sel.register(stream, selectors.EVENT_READ, [style, codecs.getincrementaldecoder("utf-8")("replace"), ""])
+    
+    try:
+        while sel.get_map():
+            for key, _ in sel.select(timeout=0.1):
+                style, decoder, pending = key.data
+                try:
+                    data = os.read(key.fd, _READ_CHUNK)
+                except BlockingIOError:
+                    continue
+                
+                if not data:
+                    # 管道关闭：输出剩余的半行
+                    rest = pending + decoder.decode(b"", final=True)
+                    if rest.strip():
+                        console.out(rest.strip(), style=style, highlight=False)
+                    sel.unregister(key.fileobj)
+                    continue
+                
+                lines = (pending + decoder.decode(data)).split("\n")
+                key.data[2] = lines.pop()
+                for line in lines:
+                    # console.out 不做 markup 解析和自动高亮，适合大量原样输出
+                    console.out(line.strip(), style=style, highlight=False)
+    finally:
+        sel.close()
+    
+    process.wait()
 
 
 # ============ 端口检查函数 ============
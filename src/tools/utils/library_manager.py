@@ -23,20 +23,25 @@ Docker Compose 模板库管理器
 import os
 import shutil
 import subprocess
+import sys
 import locale
 from pathlib import Path
 from typing import Optional, List
 
 # ============ 第三方库导入 ============
 from rich.console import Console
+from rich.text import Text
 
 # 创建 Rich 控制台对象
 console = Console()
 
-# ============ 路径常量定义 ============
+# git 失败时保留的 stderr 末尾字节数（用于错误提示）
+_GIT_ERROR_TAIL = 4096
+
+# 预构建的提示前缀（避免每次输出都解析 Rich 标记）
+_FOUND_PREFIX = Text("Found matching template: ", style="dim")
 
-# 用户模板库目录：优先使用用户目录，失败时回退到内置
-USER_LIBRARY_DIR = Path.home() / ".pulao" / "library"
+# ============ 路径常量定义 ============
 
 # 内置模板库目录：随项目打包的模板
 BUILTIN_LIBRARY_DIR = Path(__file__).parent / "library"
@@ -48,6 +53,9 @@ REPO_EN = "https://github.com/lotusTanglei/posehub.git"  # GitHub
 # ============ 本地模块导入 ============
 from src.core.config import load_config, CONFIG_DIR  # 配置加载
 
+# 用户模板库目录：位于配置目录下（与 CONFIG_DIR 的临时目录回退保持一致）
+USER_LIBRARY_DIR = CONFIG_DIR / "library"
+
 
 # ============ 模板库管理器类 ============
 
@@ -82,7 +90,6 @@ class LibraryManager:
         返回:
             模板库目录路径
         """
-        USER_LIBRARY_DIR = CONFIG_DIR / "library"
         if USER_LIBRARY_DIR.exists():
             return USER_LIBRARY_DIR
         return BUILTIN_LIBRARY_DIR
@@ -126,6 +133,72 @@ class LibraryManager:
             pass
         return REPO_EN
 
+    # ============ Git 执行方法 ============
+    
+    @staticmethod
+    def _run_git(*args: str, cwd: Optional[Path] = None) -> None:
+        """
+        执行 git 命令（clone / pull），输出照常显示在终端
+        
+        stderr 一边原样转发到终端（克隆/拉取进度照常显示），一边保留末尾部分，
+        失败时放入异常中，错误提示里可以给出 git 自身的失败原因。
+        
+        参数:
+            *args: git 子命令及参数（如 "pull", "clone"）
+            cwd: 工作目录（可选）
+        
+        异常:
+            subprocess.CalledProcessError: 命令返回非 0 退出码，
+                stderr 属性为 git 输出的错误信息（已解码）
+        """
+        cmd = ["git", *args]
+        # stderr 改为管道后 git 默认不再输出进度，终端交互时显式要求输出
+        if sys.stderr.isatty():
+            cmd.insert(2, "--progress")
+        
+        proc = subprocess.Popen(cmd, cwd=str(cwd) if cwd else None, stdin=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        tail = b""
+        with proc.stderr:
+            for chunk in iter(lambda: proc.stderr.read1(4096), b""):
+                sys.stderr.buffer.write(chunk)
+                sys.stderr.flush()
+                tail = (tail + chunk)[-_GIT_ERROR_TAIL:]
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, stderr=tail.decode("utf-8", errors="replace")
+            )
+
+    @staticmethod
+    def _describe_git_error(e: subprocess.CalledProcessError) -> str:
+        """
+        生成 git 失败的说明文本：退出码信息 + git 自身输出的错误原因
+        
+        参数:
+            e: _run_git 抛出的异常
+        
+        返回:
+            错误说明字符串
+        """
+        detail = (e.stderr or "").strip()
+        return f"{e}\n{detail}" if detail else str(e)
+
+    @staticmethod
+    def _get_current_remote(repo_dir: Path) -> str:
+        """
+        获取本地仓库的 origin 远程地址
+        
+        参数:
+            repo_dir: 本地仓库目录
+        
+        返回:
+            远程 URL，如果获取失败返回空字符串
+        """
+        result = subprocess.run(
+            ["git", "remote", "get-url", "origin"],
+            cwd=repo_dir, stdin=subprocess.DEVNULL, capture_output=True, text=True
+        )
+        return result.stdout.strip() if result.returncode == 0 else ""
+
     # ============ 模板更新方法 ============
     
     @staticmethod
@@ -152,7 +225,6 @@ class LibraryManager:
         返回:
             操作结果消息
         """
-        USER_LIBRARY_DIR = CONFIG_DIR / "library"
         repo_url = LibraryManager._get_repo_url()
         console.print(f"[bold cyan]Updating template library from {repo_url}...[/bold cyan]")
         
@@ -161,19 +233,11 @@ class LibraryManager:
                 # 情况1: 目录存在且是 git 仓库
                 if (USER_LIBRARY_DIR / ".git").exists():
                     # 检查远程 URL 是否匹配
-                    try:
-                        current_remote = subprocess.check_output(
-                            ["git", "remote", "get-url", "origin"], 
-                            cwd=USER_LIBRARY_DIR, 
-                            text=True
-                        ).strip()
-                    except subprocess.CalledProcessError:
-                        current_remote = ""
-
+                    current_remote = LibraryManager._get_current_remote(USER_LIBRARY_DIR)
                     if current_remote == repo_url:
                         # URL 匹配，执行 pull 更新
                         console.print("[dim]Pulling latest changes...[/dim]")
-                        subprocess.run(["git", "pull"], cwd=USER_LIBRARY_DIR, check=True)
+                        LibraryManager._run_git("pull", cwd=USER_LIBRARY_DIR)
                     else:
                         # URL 不匹配，备份并重新克隆
                         console.print(f"[yellow]Repository URL changed (Current: {current_remote}). Re-cloning...[/yellow]")
@@ -185,17 +249,17 @@ class LibraryManager:
                                 os.remove(backup_path)
                         shutil.move(str(USER_LIBRARY_DIR), backup_path)
                         console.print(f"[dim]Backed up old library to {backup_path}[/dim]")
-                        subprocess.run(["git", "clone", "--depth", "1", repo_url, str(USER_LIBRARY_DIR)], check=True)
+                        LibraryManager._run_git("clone", "--depth", "1", repo_url, str(USER_LIBRARY_DIR))
                 else:
                     # 情况2: 目录存在但不是 git 仓库
                     console.print("[yellow]Library directory exists but is not a git repo. Backing up and re-cloning...[/yellow]")
                     shutil.move(str(USER_LIBRARY_DIR), str(USER_LIBRARY_DIR) + ".bak")
-                    subprocess.run(["git", "clone", "--depth", "1", repo_url, str(USER_LIBRARY_DIR)], check=True)
+                    LibraryManager._run_git("clone", "--depth", "1", repo_url, str(USER_LIBRARY_DIR))
             else:
                 # 情况3: 目录不存在，直接克隆
                 USER_LIBRARY_DIR.parent.mkdir(parents=True, exist_ok=True)
                 console.print("[dim]Cloning repository...[/dim]")
-                subprocess.run(["git", "clone", "--depth", "1", repo_url, str(USER_LIBRARY_DIR)], check=True)
+                LibraryManager._run_git("clone", "--depth", "1", repo_url, str(USER_LIBRARY_DIR))
                 
             msg = f"Library updated successfully! Templates stored in: {USER_LIBRARY_DIR}"
             console.print(f"[bold green]{msg}[/bold green]")
@@ -217,15 +281,18 @@ class LibraryManager:
                     
                     # 尝试从 Gitee 克隆
                     console.print(f"[dim]Cloning from {REPO_ZH}...[/dim]")
-                    subprocess.run(["git", "clone", "--depth", "1", REPO_ZH, str(USER_LIBRARY_DIR)], check=True)
+                    LibraryManager._run_git("clone", "--depth", "1", REPO_ZH, str(USER_LIBRARY_DIR))
                     msg = "Library updated successfully (using Gitee mirror)!"
                     console.print(f"[bold green]{msg}[/bold green]")
                     return msg
+                except subprocess.CalledProcessError as e2:
+                    # git 输出可能含方括号，用 Text 输出避免被当作 markup 解析
+                    console.print(Text.assemble(("Fallback failed: ", "bold red"), LibraryManager._describe_git_error(e2)))
                 except Exception as e2:
                     console.print(f"[bold red]Fallback failed:[/bold red] {e2}")
 
-            msg = f"Failed to update library: {e}"
-            console.print(f"[bold red]{msg}[/bold red]")
+            msg = f"Failed to update library: {LibraryManager._describe_git_error(e)}"
+            console.print(Text(msg, style="bold red"))
             return msg
         except Exception as e:
             msg = f"Error updating library: {e}"
@@ -254,10 +321,14 @@ class LibraryManager:
             
         templates = []
         # 遍历目录查找包含 docker-compose 文件的文件夹
-        for item in lib_dir.iterdir():
-            if item.is_dir():
-                if (item / "docker-compose.yaml").exists() or (item / "docker-compose.yml").exists():
-                    templates.append(item.name)
+        # 使用 os.scandir：DirEntry 缓存了文件类型，避免对每个条目重复 stat
+        with os.scandir(lib_dir) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                p = entry.path
+                if os.path.exists(p + "/docker-compose.yaml") or os.path.exists(p + "/docker-compose.yml"):
+                    templates.append(entry.name)
         return sorted(templates)
 
     # ============ 模板获取方法 ============
@@ -307,7 +378,7 @@ class LibraryManager:
                 candidate_dir = lib_dir / tpl
                 content = try_read(candidate_dir)
                 if content:
-                    console.print(f"[dim]Found matching template: {tpl}[/dim]")
+                    console.print(_FOUND_PREFIX + Text(tpl, style="dim"))
                     return content
                     
         return None
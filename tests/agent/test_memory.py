@@ -0,0 +1,152 @@
+import base64
+import json
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+from src.agent import memory
+from src.agent.memory import MemoryManager, HISTORY_MAX_MESSAGES, get_embedding_service
+
+class TestEmbeddingService:
+    @patch("src.agent.memory.load_config")
+    def test_embedding_service_follows_provider(self, mock_config):
+        """测试切换提供商后嵌入服务使用新的凭据和端点"""
+        mock_config.return_value = {"api_key": "key-a", "base_url": "http://a.example/v1", "embedding_cache": False}
+        first = get_embedding_service()
+        assert get_embedding_service() is first
+
+        mock_config.return_value = {"api_key": "key-b", "base_url": "http://b.example/v1", "embedding_cache": False}
+        second = get_embedding_service()
+        assert second is not first
+        assert second.client.api_key == "key-b"
+        assert str(second.client.base_url).startswith("http://b.example/v1")
+
+
+@pytest.fixture
+def history_files(tmp_path):
+    """将历史文件重定向到临时目录，并使用独立的后台写入器"""
+    history_file = tmp_path / "history.jsonl"
+    legacy_file = tmp_path / "history.json"
+    with patch.object(memory, "HISTORY_FILE", history_file), \
+         patch.object(memory, "LEGACY_HISTORY_FILE", legacy_file), \
+         patch.object(memory, "_HISTORY_WRITER", memory._HistoryWriter()):
+        yield history_file, legacy_file
+
+
+def _messages(n):
+    """生成 n 轮 user/assistant 对话"""
+    result = []
+    for i in range(n):
+        result.append({"role": "user", "content": f"q{i}"})
+        result.append({"role": "assistant", "content": f"a{i}"})
+    return result
+
+
+class TestMemoryManager:
+    def test_append_and_load(self, history_files):
+        """测试追加消息后可以读回，系统消息不写入"""
+        MemoryManager.append_message({"role": "system", "content": "sys"})
+        for message in _messages(2):
+            MemoryManager.append_message(message)
+
+        assert [m["content"] for m in MemoryManager.load_history()] == ["q0", "a0", "q1", "a1"]
+        assert len(history_files[0].read_bytes().splitlines()) == 4
+
+    def test_load_skips_corrupted_line(self, history_files):
+        """测试追加被中断留下的不完整行会被跳过"""
+        history_files[0].write_bytes(b'{"role": "user", "content": "q0"}\n{"role": "assis')
+        assert MemoryManager.load_history() == [{"role": "user", "content": "q0"}]
+
+    def test_migrate_legacy_history(self, history_files):
+        """测试旧版 history.json 自动迁移为 JSON Lines"""
+        history_file, legacy_file = history_files
+        legacy_file.write_text(json.dumps([{"role": "system", "content": "sys"}] + _messages(1)), encoding="utf-8")
+
+        assert [m["content"] for m in MemoryManager.load_history()] == ["q0", "a0"]
+        assert not legacy_file.exists()
+        assert len(history_file.read_bytes().splitlines()) == 2
+
+    def test_compact_keeps_recent_messages(self, history_files):
+        """测试压缩后只保留最近 HISTORY_MAX_MESSAGES 条，且以用户消息开头"""
+        for message in _messages(40):
+            MemoryManager.append_message(message)
+        MemoryManager.compact_history()
+        MemoryManager.flush()
+
+        lines = history_files[0].read_bytes().splitlines()
+        assert len(lines) == HISTORY_MAX_MESSAGES
+        assert json.loads(lines[0]) == {"role": "user", "content": "q15"}
+        assert json.loads(lines[-1]) == {"role": "assistant", "content": "a39"}
+
+    @patch("src.agent.memory.HISTORY_COMPACT_INTERVAL", 10)
+    def test_auto_compact_after_interval(self, history_files):
+        """测试追加条数达到压缩间隔时自动压缩"""
+        with patch("src.agent.memory.HISTORY_MAX_MESSAGES", 4):
+            for message in _messages(5):
+                MemoryManager.append_message(message)
+            MemoryManager.flush()
+
+        assert [json.loads(line)["content"] for line in history_files[0].read_bytes().splitlines()] == ["q3", "a3", "q4", "a4"]
+
+    def test_save_supersedes_earlier_appends(self, history_files):
+        """测试同一批写入中快照覆盖之前的追加，之后的追加接在快照后面"""
+        writer = memory._HISTORY_WRITER
+        writer._process([
+            ("append", {"role": "user", "content": "old"}),
+            ("save", [{"role": "user", "content": "q0"}]),
+            ("append", {"role": "assistant", "content": "a0"}),
+        ])
+
+        assert [m["content"] for m in MemoryManager.load_history()] == ["q0", "a0"]
+
+    def test_clear_history(self, history_files):
+        """测试清除历史时等待写入完成并删除文件"""
+        MemoryManager.append_message({"role": "user", "content": "q0"})
+        MemoryManager.clear_history()
+        assert not history_files[0].exists()
+        assert MemoryManager.load_history() == []
+
+
+class TestEmbeddingCache:
+    def test_memory_and_disk_cache(self, tmp_path):
+        """测试向量写入后可从内存命中，新实例可从磁盘读取"""
+        path = tmp_path / "embeddings.sqlite3"
+        key = memory._EmbeddingCache.make_key("m", "hello")
+        vec = np.arange(4, dtype=np.float32)
+
+        cache = memory._EmbeddingCache(path=path)
+        assert cache.get(key) is None
+        cache.put(key, vec)
+        assert cache.get(key) is vec
+
+        reloaded = memory._EmbeddingCache(path=path).get(key)
+        assert reloaded.dtype == np.float32
+        np.testing.assert_array_equal(reloaded, vec)
+
+    def test_lru_evicts_oldest(self, tmp_path):
+        """测试内存缓存超出容量时淘汰最久未使用的向量"""
+        cache = memory._EmbeddingCache(path=tmp_path / "e.sqlite3", capacity=2)
+        keys = [memory._EmbeddingCache.make_key("m", str(i)) for i in range(3)]
+        cache.put(keys[0], np.zeros(2, dtype=np.float32))
+        cache.put(keys[1], np.zeros(2, dtype=np.float32))
+        cache.get(keys[0])
+        cache.put(keys[2], np.zeros(2, dtype=np.float32))
+
+        assert list(cache._memory) == [keys[0], keys[2]]
+
+    @patch("src.agent.memory.get_openai_client")
+    def test_get_embeddings_requests_only_missing(self, mock_client, tmp_path):
+        """测试批量嵌入只为未命中缓存的文本发送请求，结果顺序与输入一致"""
+        encoded = base64.b64encode(np.array([1.0, 2.0], dtype=np.float32).tobytes()).decode()
+        mock_client.return_value.embeddings.create.return_value = MagicMock(data=[MagicMock(embedding=encoded)])
+
+        with patch.object(memory.EmbeddingService, "_cache", memory._EmbeddingCache(path=tmp_path / "e.sqlite3")):
+            service = memory.EmbeddingService({"api_key": "k"})
+            cached_key = memory._EmbeddingCache.make_key(service.model, "cached")
+            memory.EmbeddingService._cache.put(cached_key, np.array([9.0, 9.0], dtype=np.float32))
+
+            result = service.get_embeddings(["cached", "new\ntext"])
+
+        create = mock_client.return_value.embeddings.create
+        create.assert_called_once()
+        assert create.call_args.kwargs["input"] == ["new text"]
+        np.testing.assert_array_equal(result, [[9.0, 9.0], [1.0, 2.0]])
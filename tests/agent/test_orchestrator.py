@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from src.agent.orchestrator import _match_template, _process_new_messages
+from src.agent.orchestrator import _match_template, _process_new_messages, AISession
 
 class TestOrchestrator:
     @patch("src.agent.orchestrator.LibraryManager")
@@ -26,3 +26,20 @@ class TestOrchestrator:
         _process_new_messages(session, [msg1, msg2, msg3])
         assert session.add_assistant_message.call_count == 2
         session.add_tool_message.assert_called_once_with("call_1", "Port 8080 is available")
+
+    @patch("src.agent.orchestrator.HISTORY_MAX_MESSAGES", 4)
+    @patch("src.agent.orchestrator.MemoryManager")
+    def test_add_user_message_trims_history(self, mock_memory):
+        session = AISession.__new__(AISession)
+        session.history = [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "q1"},
+            {"role": "assistant", "content": "", "tool_calls": [{"id": "call_1"}]},
+            {"role": "tool", "tool_call_id": "call_1", "content": "ok"},
+            {"role": "user", "content": "q2"},
+            {"role": "assistant", "content": "a2"},
+        ]
+        session.add_user_message("q3")
+        # 保留系统消息；截断点落在 user 消息上，不留下孤立的 tool 消息
+        assert [m["content"] for m in session.history] == ["sys", "q2", "a2", "q3"]
+        mock_memory.append_message.assert_called_once_with({"role": "user", "content": "q3"})
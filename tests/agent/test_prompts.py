@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import patch
+from src.agent import prompts
+from src.agent.prompts import load_prompts, get_system_prompt, get_default_prompts, clear_prompts_cache, invalidate_system_info_cache
+
+@pytest.fixture
+def prompts_file(tmp_path):
+    """将提示词文件重定向到临时目录"""
+    path = tmp_path / "prompts_en.yaml"
+    clear_prompts_cache()
+    invalidate_system_info_cache()
+    with patch("src.agent.prompts.CONFIG_DIR", tmp_path), \
+         patch("src.agent.prompts.get_prompts_file", return_value=path):
+        yield path
+    clear_prompts_cache()
+    invalidate_system_info_cache()
+
+
+class TestPrompts:
+    def test_load_prompts_cached_until_file_changes(self, prompts_file):
+        """测试提示词文件未变化时不重新解析，变化后合并用户配置"""
+        with patch("src.agent.prompts._load_prompts_from_file", wraps=prompts._load_prompts_from_file) as mock_load:
+            first = load_prompts("en")
+            assert prompts_file.exists()
+            first["role_definition"] = "changed"
+            second = load_prompts("en")
+            assert mock_load.call_count == 1
+            assert second["role_definition"] != "changed"
+
+            prompts_file.write_text("role_definition: custom role\n", encoding="utf-8")
+            third = load_prompts("en")
+            assert mock_load.call_count == 2
+            assert third["role_definition"] == "custom role"
+            assert third["output_format"] == second["output_format"]
+
+    @patch("src.agent.prompts.ClusterManager")
+    @patch("src.agent.prompts.get_system_info", return_value="[Local]\nOS: test")
+    def test_system_prompt_reused_while_inputs_unchanged(self, mock_info, mock_cluster, prompts_file):
+        """测试输入未变化时复用系统提示词，本机信息在有效期内只采集一次"""
+        mock_cluster.get_current_nodes_json.return_value = ""
+        first = get_system_prompt("en")
+        assert "OS: test" in first
+        assert get_system_prompt("en") is first
+        assert mock_info.call_count == 1
+
+        # 本机信息失效并变化后重新生成
+        mock_info.return_value = "[Local]\nOS: other"
+        invalidate_system_info_cache()
+        second = get_system_prompt("en")
+        assert mock_info.call_count == 2
+        assert "OS: other" in second
+
+    @patch("src.agent.prompts.ClusterManager")
+    @patch("src.agent.prompts.get_system_info", return_value="[Local]")
+    def test_system_prompt_follows_cluster_changes(self, mock_info, mock_cluster, prompts_file):
+        """测试集群节点变化时重新生成系统提示词"""
+        mock_cluster.get_current_nodes_json.return_value = ""
+        assert "No nodes configured" in get_system_prompt("en")
+
+        mock_cluster.get_current_cluster_name.return_value = "prod"
+        mock_cluster.get_current_nodes_json.return_value = '[{"name": "node1"}]'
+        assert "[Cluster Nodes (prod)]" in get_system_prompt("en")
+
+    def test_default_output_format_keeps_trailing_spaces(self):
+        """测试默认输出格式与迁移到 YAML 前的常量逐字一致（含行尾空格）"""
+        assert get_default_prompts("en")["output_format"] == (
+            "Output Format:\n"
+            "Use Function Calling (Tools) for actions. \n"
+            "If you need to ask a question to the user, just output the question as plain text. \n"
+            '**Do NOT output JSON blocks like {"type": "question"}.**\n'
+        )
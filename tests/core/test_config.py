@@ -1,16 +1,41 @@
 import pytest
 import os
 from unittest.mock import patch, mock_open
-from src.core.config import load_config
+from src.core.config import load_config, clear_config_cache
 
 class TestConfig:
+    def setup_method(self):
+        clear_config_cache()
+
+    def teardown_method(self):
+        clear_config_cache()
+
     @patch("src.core.config.os.path.exists")
     @patch("src.core.config.open", new_callable=mock_open, read_data="current_provider: openai\nproviders:\n  openai:\n    api_key: test-key")
     def test_load_config_success(self, mock_file, mock_exists):
         """测试加载配置文件"""
         mock_exists.return_value = True
         config = load_config()
-        
+
         assert config["current_provider"] == "openai"
         assert "openai" in config["providers"]
         assert config["providers"]["openai"]["api_key"] == "test-key"
+
+    @patch("src.core.config.file_stamp", return_value=(1, 10))
+    @patch("src.core.config.os.path.exists")
+    @patch("src.core.config.open", new_callable=mock_open, read_data="current_provider: openai\nproviders:\n  openai:\n    api_key: test-key")
+    def test_load_config_cached(self, mock_file, mock_exists, mock_stamp):
+        """测试配置文件未变化时使用缓存，且返回副本"""
+        mock_exists.return_value = True
+        first = load_config()
+        first["providers"]["openai"]["api_key"] = "changed"
+        second = load_config()
+
+        # 文件只读取一次（全局 + 用户配置各打开一次）
+        assert mock_file.call_count == 2
+        assert second["providers"]["openai"]["api_key"] == "test-key"
+
+        # 状态戳变化后重新读取
+        mock_stamp.return_value = (2, 10)
+        load_config()
+        assert mock_file.call_count == 4
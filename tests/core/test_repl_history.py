@@ -0,0 +1,32 @@
+import pytest
+from src.core.repl_history import CappedFileHistory, CappedThreadedHistory
+
+class TestReplHistory:
+    def test_file_history_keeps_newest_entries(self, tmp_path):
+        """测试加载时只取最新的 max_entries 条，每追加 max_entries 条压缩一次文件"""
+        path = tmp_path / "repl_history"
+        history = CappedFileHistory(str(path), max_entries=3)
+        for i in range(5):
+            history.store_string(f"cmd{i}")
+        assert list(history.load_history_strings()) == ["cmd4", "cmd3", "cmd2"]
+
+        history.store_string("cmd5")
+        reloaded = CappedFileHistory(str(path), max_entries=10)
+        assert list(reloaded.load_history_strings()) == ["cmd5", "cmd4", "cmd3"]
+
+    def test_compact_preserves_multiline_entries(self, tmp_path):
+        """测试压缩后多行输入仍作为一条记录读回"""
+        path = tmp_path / "repl_history"
+        history = CappedFileHistory(str(path), max_entries=2)
+        history.store_string("first")
+        history.store_string("line1\nline2")
+
+        assert list(CappedFileHistory(str(path)).load_history_strings()) == ["line1\nline2", "first"]
+
+    def test_threaded_history_caps_memory(self, tmp_path):
+        """测试内存中的历史不超过上限，且最新的在前"""
+        history = CappedThreadedHistory(CappedFileHistory(str(tmp_path / "repl_history"), max_entries=3))
+        for i in range(5):
+            history.append_string(f"cmd{i}")
+
+        assert history._loaded_strings == ["cmd4", "cmd3", "cmd2"]
@@ -0,0 +1,35 @@
+from unittest.mock import patch, MagicMock
+from src.tools.docker import docker_client
+from src.tools.docker.docker_client import get_docker_api, reset_docker_api
+
+class TestDockerClient:
+    def setup_method(self):
+        docker_client._APIS.clear()
+
+    def teardown_method(self):
+        docker_client._APIS.clear()
+
+    @patch("docker.from_env")
+    def test_clients_cached_per_timeout(self, mock_from_env):
+        """测试每个超时时间各缓存一个客户端，后来的调用方传入的超时同样生效"""
+        mock_from_env.side_effect = lambda timeout: MagicMock(api=MagicMock(timeout=timeout))
+
+        short = get_docker_api(2)
+        default = get_docker_api()
+
+        assert short.timeout == 2
+        assert default.timeout == docker_client.DOCKER_API_TIMEOUT
+        assert get_docker_api(2) is short
+        assert mock_from_env.call_count == 2
+
+    @patch("docker.from_env")
+    def test_reset_closes_all_clients(self, mock_from_env):
+        """测试重置时关闭并丢弃所有客户端"""
+        mock_from_env.side_effect = lambda timeout: MagicMock()
+        apis = [get_docker_api(2), get_docker_api(5)]
+
+        reset_docker_api()
+
+        for api in apis:
+            api.close.assert_called_once()
+        assert docker_client._APIS == {}
@@ -0,0 +1,16 @@
+import subprocess
+import pytest
+from src.tools.utils.library_manager import LibraryManager
+
+class TestLibraryManager:
+    def test_run_git_error_carries_stderr(self, tmp_path, capfd):
+        """测试 git 失败时输出照常显示，且异常中带有 git 的错误原因"""
+        with pytest.raises(subprocess.CalledProcessError) as exc:
+            LibraryManager._run_git("clone", "--depth", "1", str(tmp_path / "missing"), str(tmp_path / "dest"))
+        assert "does not exist" in exc.value.stderr
+        assert "does not exist" in LibraryManager._describe_git_error(exc.value)
+        assert "does not exist" in capfd.readouterr().err
+
+    def test_get_current_remote_outside_repo(self, tmp_path):
+        """测试不是 git 仓库时远程地址为空"""
+        assert LibraryManager._get_current_remote(tmp_path) == ""
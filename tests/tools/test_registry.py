@@ -1,5 +1,7 @@
+import subprocess
 import pytest
-from src.tools.registry import ToolRegistry
+from unittest.mock import patch
+from src.tools.registry import ToolRegistry, execute_command
 
 class TestToolRegistry:
     def setup_method(self):
@@ -43,3 +45,23 @@ class TestToolRegistry:
         assert "计算两数之和" in schema["function"]["description"]
         assert "x" in schema["function"]["parameters"]["properties"]
         assert schema["function"]["parameters"]["properties"]["x"]["type"] == "integer"
+        assert schema["function"]["parameters"]["properties"]["x"]["description"] == "第一个数"
+
+    def test_reregister_replaces_schema(self):
+        """测试同一函数重复注册时复用模式且不重复添加"""
+        def ping() -> str:
+            """Ping."""
+            return "pong"
+        
+        self.registry.register(ping)
+        first = self.registry.schemas[0]
+        self.registry.register(ping)
+        
+        assert len(self.registry.schemas) == 1
+        assert self.registry.schemas[0] is first
+
+    @patch("subprocess.run", wraps=subprocess.run)
+    def test_execute_command_detaches_stdin(self, mock_run):
+        """测试 AI 执行的命令不继承终端的标准输入"""
+        assert execute_command("cat") == "Stdout: "
+        assert mock_run.call_args.kwargs["stdin"] == subprocess.DEVNULL
@@ -0,0 +1,139 @@
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+from src.tools.cluster import remote_ops
+from src.tools.cluster.remote_ops import RemoteExecutor, SSHConnectionError
+
+NODE = {"name": "node1", "host": "10.0.0.1", "user": "root"}
+NODE2 = {"name": "node2", "host": "10.0.0.2", "user": "root"}
+
+class TestRemoteOps:
+    def setup_method(self):
+        remote_ops._CONN_CACHE.clear()
+
+    def test_compose_script_quotes_project_name(self):
+        """测试部署脚本转义项目名称"""
+        script = RemoteExecutor._compose_script("my app")
+        assert "mkdir -p ~/.pulao/deployments/'my app'" in script
+        assert script.endswith("docker compose up -d --remove-orphans")
+
+    @patch.object(RemoteExecutor, "check_connection")
+    def test_check_connections_maps_results(self, mock_check):
+        """测试并行连接检查按节点名称返回结果，失败的节点对应异常对象"""
+        error = SSHConnectionError("down")
+
+        def check(node):
+            if node is NODE2:
+                raise error
+            return True
+
+        mock_check.side_effect = check
+
+        assert RemoteExecutor.check_connections([NODE, NODE2]) == {"node1": True, "node2": error}
+        assert RemoteExecutor.check_connections([]) == {}
+
+    @patch.object(RemoteExecutor, "deploy_compose")
+    def test_deploy_compose_many_runs_concurrently(self, mock_deploy):
+        """测试多节点部署并发执行，各节点使用自己的 YAML"""
+        barrier = threading.Barrier(2, timeout=5)
+        error = SSHConnectionError("down")
+
+        def deploy(node, yaml_content, project_name):
+            # 两个节点都进入后才继续：串行执行会在这里超时
+            barrier.wait()
+            if node is NODE2:
+                raise error
+
+        mock_deploy.side_effect = deploy
+        results = RemoteExecutor.deploy_compose_many([(NODE, "a: 1"), (NODE2, "b: 2")], "app")
+
+        assert results == {"node1": None, "node2": error}
+        mock_deploy.assert_any_call(NODE, "a: 1", "app")
+        mock_deploy.assert_any_call(NODE2, "b: 2", "app")
+
+    def test_ssh_cmd_reuses_master_connection(self):
+        """测试 SSH 命令带有连接复用选项，控制套接字位于私有目录"""
+        node = {**NODE, "key_path": "/keys/id_rsa"}
+        cmd = RemoteExecutor._build_ssh_cmd(node, "uptime")
+
+        assert cmd[0] == "ssh"
+        assert "ControlMaster=auto" in cmd
+        assert f"ControlPath={remote_ops.SSH_CONTROL_PATH}" in cmd
+        assert remote_ops.SSH_CONTROL_PATH.startswith(str(remote_ops.SSH_CONTROL_DIR))
+        assert cmd[-4:] == ["-i", "/keys/id_rsa", "root@10.0.0.1", "uptime"]
+
+    def test_control_dir_created_on_first_use(self, tmp_path):
+        """测试控制套接字目录在第一次构建 SSH 命令时才创建，权限为 0700"""
+        control_dir = tmp_path / "ssh"
+        with patch.object(remote_ops, "SSH_CONTROL_DIR", control_dir), \
+                patch.object(remote_ops, "_CONTROL_DIR_READY", False):
+            assert not control_dir.exists()
+            RemoteExecutor._build_scp_cmd(NODE, "a.yml", "~/a.yml")
+
+            assert control_dir.is_dir()
+            assert control_dir.stat().st_mode & 0o777 == 0o700
+
+    @patch("src.tools.cluster.remote_ops.subprocess.run")
+    def test_deploy_compose_single_ssh_call(self, mock_run):
+        """测试部署只发起一次 SSH 调用，YAML 通过标准输入传入"""
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        RemoteExecutor.deploy_compose(NODE, "services: {}\n", "app")
+
+        mock_run.assert_called_once()
+        args, kwargs = mock_run.call_args
+        assert args[0][-1] == RemoteExecutor._compose_script("app")
+        assert kwargs["input"] == "services: {}\n"
+        assert kwargs["timeout"] == remote_ops.DEPLOY_TIMEOUT
+
+    @patch("src.tools.cluster.remote_ops.subprocess.run")
+    def test_execute_without_input_closes_stdin(self, mock_run):
+        """测试没有输入时远程命令的标准输入为 /dev/null"""
+        mock_run.return_value = MagicMock(returncode=0, stdout=" up 3 days \n", stderr="")
+        assert RemoteExecutor.execute(NODE, "uptime") == "up 3 days"
+        assert mock_run.call_args.kwargs["stdin"] == remote_ops.subprocess.DEVNULL
+
+    @pytest.mark.parametrize("stderr, exc_type, message", [
+        (b"root@10.0.0.1: Permission denied (publickey).", remote_ops.SSHAuthError, "Authentication failed"),
+        (b"ssh: connect to host 10.0.0.1 port 22: Connection refused", SSHConnectionError, "Connection refused"),
+        (b"ssh: Could not resolve hostname nohost: Name or service not known", SSHConnectionError, "Could not resolve hostname"),
+        (b"kex_exchange_identification: read: Connection reset", SSHConnectionError, "Connection failed"),
+    ])
+    @patch("src.tools.cluster.remote_ops.subprocess.run")
+    def test_connection_error_classification(self, mock_run, stderr, exc_type, message):
+        """测试连接失败时按 stderr 内容抛出对应的异常类型"""
+        mock_run.return_value = MagicMock(returncode=255, stderr=stderr)
+        with pytest.raises(exc_type, match=message):
+            RemoteExecutor.check_connection(NODE)
+
+    @patch("src.tools.cluster.remote_ops.subprocess.run")
+    def test_check_connection_cached_within_ttl(self, mock_run):
+        """测试连接检查结果在有效期内复用，失败结果同样缓存"""
+        mock_run.return_value = MagicMock(returncode=0, stderr=b"")
+        assert RemoteExecutor.check_connection(NODE) is True
+        assert RemoteExecutor.check_connection(NODE) is True
+        assert mock_run.call_count == 1
+
+        mock_run.return_value = MagicMock(returncode=255, stderr=b"Connection refused")
+        with pytest.raises(SSHConnectionError):
+            RemoteExecutor.check_connection(NODE2)
+        with pytest.raises(SSHConnectionError):
+            RemoteExecutor.check_connection(NODE2)
+        assert mock_run.call_count == 2
+
+    @patch("src.tools.cluster.remote_ops.subprocess.run")
+    def test_check_connection_recheck_after_expiry_or_failure(self, mock_run):
+        """测试缓存过期或远程操作失败后重新检查连接"""
+        mock_run.return_value = MagicMock(returncode=0, stderr=b"")
+        RemoteExecutor.check_connection(NODE)
+
+        with patch("src.tools.cluster.remote_ops.CONN_CACHE_TTL", 0):
+            RemoteExecutor.check_connection(NODE)
+        assert mock_run.call_count == 2
+
+        # 远程命令失败会清除该节点的缓存
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="boom")
+        with pytest.raises(remote_ops.SSHCommandError):
+            RemoteExecutor.execute(NODE, "false")
+        mock_run.return_value = MagicMock(returncode=0, stderr=b"")
+        RemoteExecutor.check_connection(NODE)
+        assert mock_run.call_count == 4
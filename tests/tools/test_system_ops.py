@@ -1,28 +1,39 @@
+import subprocess
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 from src.tools.system.system_ops import execute_shell_command, check_port_available
 
 class TestSystemOps:
-    @patch("src.tools.system.system_ops.subprocess.Popen")
-    def test_execute_shell_command_success(self, mock_popen):
+    @patch("src.tools.system.system_ops._STDBUF", None)
+    @patch("src.tools.system.system_ops.console")
+    @patch("src.tools.system.system_ops.subprocess.Popen", wraps=subprocess.Popen)
+    def test_execute_shell_command_success(self, mock_popen, mock_console):
         """测试执行 shell 命令"""
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["hello world\n", ""]
-        mock_process.poll.side_effect = [None, 0]
-        mock_process.stderr.read.return_value = ""
-        mock_process.returncode = 0
-        mock_popen.return_value = mock_process
-        
         execute_shell_command("echo 'hello world'")
         
         mock_popen.assert_called_once_with(
             "echo 'hello world'", 
             shell=True,
+            stdin=subprocess.DEVNULL,
             stdout=-1, # subprocess.PIPE is -1
             stderr=-1,
-            text=True,
-            executable="/bin/bash"
+            executable="/bin/bash",
+            env=ANY
         )
+        assert mock_popen.call_args.kwargs["env"]["PYTHONUNBUFFERED"] == "1"
+        printed = [c.args[0] for c in mock_console.out.call_args_list]
+        assert "hello world" in printed
+        
+    @patch("src.tools.system.system_ops.console")
+    def test_execute_shell_command_streams_stderr(self, mock_console):
+        """测试 stdout 与 stderr 同时读取，stderr 以红色显示"""
+        execute_shell_command("echo out; echo err >&2; echo tail")
+        
+        calls = mock_console.out.call_args_list
+        printed = [c.args[0] for c in calls]
+        assert "out" in printed and "tail" in printed
+        err_call = calls[printed.index("err")]
+        assert err_call.kwargs["style"] == "red"
         
     @patch("src.tools.system.system_ops.socket.socket")
     def test_check_port_available(self, mock_socket):